@@ -0,0 +1,62 @@
+"""
+Measures the time ``import viur.scriptor`` and ``from viur.scriptor import *`` take in a fresh interpreter and fails if
+one of them exceeds the budget or if one of the heavy optional dependencies is imported at startup.
+
+    python scripts/benchmark_import.py --runs 10 --budget-ms 250
+"""
+import argparse
+import statistics
+import subprocess
+import sys
+
+HEAVY_MODULES = ("openpyxl", "magic", "chardet", "prompt_toolkit", "simple_term_menu", "requests", "urllib3")
+
+# the star-import is how scripts usually start, it also resolves every name in __all__
+STATEMENTS = ("import viur.scriptor", "from viur.scriptor import *")
+
+
+def measure_import_time(statement: str) -> float:
+    """
+    returns the time ``statement`` takes in a fresh interpreter in milliseconds
+
+    :param statement: the import-statement to measure
+    """
+    code = f"""import time; _start = time.perf_counter(); {statement}; print(time.perf_counter() - _start)"""
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    return float(result.stdout.strip()) * 1000
+
+
+def get_loaded_heavy_modules(statement: str) -> list[str]:
+    """
+    returns the heavy modules that are in ``sys.modules`` after ``statement``
+
+    :param statement: the import-statement to check
+    """
+    code = f"""import sys; {statement}; print(",".join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"""
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    return [name for name in result.stdout.strip().split(",") if name]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10, help="the number of fresh interpreters to measure")
+    parser.add_argument("--budget-ms", type=float, default=250.0, help="the maximum median import time")
+    args = parser.parse_args()
+
+    failed = False
+    for statement in STATEMENTS:
+        timings = sorted(measure_import_time(statement) for _ in range(args.runs))
+        median = statistics.median(timings)
+        print(f"""{statement}: median {median:.1f} ms, min {timings[0]:.1f} ms, max {timings[-1]:.1f} ms """
+              f"""({args.runs} runs, budget {args.budget_ms:.0f} ms)""")
+        if median > args.budget_ms:
+            print(f"""FAIL: the median time of "{statement}" exceeds the budget of {args.budget_ms:.0f} ms.""")
+            failed = True
+        if heavy_modules := get_loaded_heavy_modules(statement):
+            print(f"""FAIL: imported by "{statement}": {", ".join(heavy_modules)}""")
+            failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,4 @@
-from .requests import WebRequest, WebResponse
+from .requests import WebRequest, WebResponse, WebStreamResponse
 from .dialog import Dialog
 from .file import File
 from .logger import logger
@@ -8,9 +8,17 @@ from .http_errors import *
 from ._utils import is_pyodide_context, is_pyodide_in_browser, gather_async_iterator, clear_console
 from .utils import extract_items, map_extract_items
 import os
-from requests.exceptions import ConnectionError
 from .directory_handler import DirectoryHandler
 from .progressbar import ProgressBar
+from .retry import RetryPolicy
+from .cache import ResponseCache
+from .metrics import RequestInfo
+from . import tracing
+from .tracing import start_tracing, stop_tracing
+from .cassette import Cassette, CassetteError
+from .cursor import ListCursor
+from .bulk import BulkResult
+from ._codec import set_json_codec, get_json_codec
 
 __version__ = '1.14.3'
 
@@ -26,7 +34,7 @@ if is_pyodide_context():
     import config
 
 
-    async def _init_modules():
+    async def _init_modules(config_cache=False):
         global modules
         global params
         try:
@@ -36,7 +44,7 @@ if is_pyodide_context():
                 params["__is_dev__"] = True
         except ModuleNotFoundError:
             pass
-        modules = Modules(config.BASE_URL, None, None)
+        modules = Modules(config.BASE_URL, None, None, config_cache=config_cache)
         await modules.init()
         return True
 else:
@@ -47,7 +55,10 @@ else:
         login_skey=None,
         script_params=None,
         cookies=None,
+        session_cache=False,
+        config_cache=False,
     ):
+        from requests.exceptions import ConnectionError
         global modules, params
         assert not modules, "already initialized"
         params = script_params
@@ -56,7 +67,9 @@ else:
                               username=username or os.environ.get('SCRIPTOR_USER', None),
                               password=password or os.environ.get('SCRIPTOR_PASSWORD', None),
                               login_skey=login_skey,
-                              cookies=cookies
+                              cookies=cookies,
+                              session_cache=session_cache,
+                              config_cache=config_cache,
                               )
             await modules.init()
             return True
@@ -65,23 +78,45 @@ else:
             modules = None
             return False
 
+
+def __getattr__(name):
+    # requests is only imported when ConnectionError is used, it's not part of __all__ so that
+    # "from viur.scriptor import *" doesn't import it
+    if name == "ConnectionError":
+        from requests.exceptions import ConnectionError
+        return ConnectionError
+    raise AttributeError(f"""module "{__name__}" has no attribute "{name}\"""")
+
+
 __all__ = [
     'is_pyodide_context',
     'is_pyodide_in_browser',
     'WebRequest',
     'WebResponse',
+    'WebStreamResponse',
     'DirectoryHandler',
     'Dialog',
     'File',
     'logger',
     'modules',
     'Message',
-    'ConnectionError',
     'gather_async_iterator',
     'params',
     'extract_items',
     'map_extract_items',
     'ProgressBar',
+    'RetryPolicy',
+    'ResponseCache',
+    'RequestInfo',
+    'start_tracing',
+    'stop_tracing',
+    'tracing',
+    'Cassette',
+    'CassetteError',
+    'ListCursor',
+    'BulkResult',
+    'set_json_codec',
+    'get_json_codec',
     'version',
 ]
 
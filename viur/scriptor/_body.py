@@ -0,0 +1,158 @@
+from urllib.parse import urlencode
+from ._utils import is_pyodide_context, flatten_dict
+
+if is_pyodide_context():
+    import js
+    from pyodide.ffi import to_js, JsProxy
+    from ._utils import bytes_to_blob
+
+URLENCODED_MAX_SIZE = 64 * 1024  # larger payloads are sent as multipart/form-data
+STREAM_MIN_SIZE = 1024 * 1024  # larger multipart-bodies are streamed instead of built in memory
+_BYTES_LIKE = (bytes, bytearray, memoryview)
+
+
+def flatten_fields(data) -> list[tuple]:
+    """
+    converts the parameters of a request into a ``list`` of ``(name, value)``-pairs
+
+    :param data: a (possibly nested) ``dict`` or a ``list`` of ``(name, value)``-pairs
+    :return: the flattened ``list`` of ``(name, value)``-pairs
+    """
+    if isinstance(data, dict):
+        return list(flatten_dict(data))
+    elif isinstance(data, list):
+        return [(name, "" if value is None else value) for name, value in data]
+    raise ValueError(f"data must be a dict or a list of pairs, but is {type(data)}")
+
+
+def _is_scalar(value) -> bool:
+    return isinstance(value, (str, int, float))
+
+
+def _estimate_size(fields: list[tuple]) -> int:
+    size = 0
+    for name, value in fields:
+        if isinstance(value, tuple):
+            value = value[1]
+        if isinstance(value, memoryview):
+            size += len(name) + value.nbytes
+        elif isinstance(value, (str, bytes, bytearray)):
+            size += len(name) + len(value)
+        else:
+            size += len(name) + 8
+    return size
+
+
+def estimate_body_size(data) -> int:
+    """
+    estimates the size of the encoded parameters of a request in bytes
+
+    :param data: a (possibly nested) ``dict`` or a ``list`` of ``(name, value)``-pairs
+    """
+    return _estimate_size(flatten_fields(data))
+
+
+if is_pyodide_context():
+    _form_data_from_entries = None
+
+    def encode_body(data) -> dict:
+        """
+        converts the parameters of a request into the body of a ``fetch``-request
+
+        Small payloads of scalar values become ``URLSearchParams`` (url-encoded), everything else becomes
+        ``FormData``. Both are created from all fields at once instead of one JavaScript-call per field.
+
+        :param data: a (possibly nested) ``dict`` or a ``list`` of ``(name, value)``-pairs
+        :return: the keyword-arguments for ``fetch``
+        """
+        global _form_data_from_entries
+        fields = flatten_fields(data)
+        if all(_is_scalar(value) for _, value in fields) and _estimate_size(fields) <= URLENCODED_MAX_SIZE:
+            return {"body": js.URLSearchParams.new(to_js([[name, str(value)] for name, value in fields]))}
+        if _form_data_from_entries is None:
+            _form_data_from_entries = js.Function.new(
+                "entries",
+                "const fd = new FormData(); for (const [k, v] of entries) { fd.append(k, v); } return fd;"
+            )
+        entries = []
+        for name, value in fields:
+            if isinstance(value, tuple):
+                filename, value, *_ = value
+                if isinstance(value, _BYTES_LIKE):
+                    value = bytes_to_blob(value)
+                value = js.File.new([value], filename)
+            elif isinstance(value, _BYTES_LIKE):
+                value = bytes_to_blob(value)
+            elif isinstance(value, JsProxy):
+                pass  # i.e. a Blob or File picked in the browser, FormData takes it as it is
+            else:
+                value = str(value)
+            entries.append([name, value])
+        return {"body": _form_data_from_entries(to_js(entries))}
+else:
+    class MultipartStream:
+        """
+        A ``multipart/form-data``-body that is produced part by part while it's sent, instead of being built in
+        memory first. The length is known in advance, so the request is sent with a ``Content-Length``-header.
+
+        :param fields: a ``list`` of ``(name, value)``-pairs, values can be ``(filename, data[, mimetype])``-tuples
+        :param boundary: the multipart-boundary, a random one is chosen if omitted
+        """
+
+        def __init__(self, fields: list[tuple], boundary: str = None):
+            from urllib3.fields import RequestField
+            from urllib3.filepost import choose_boundary
+            self.boundary = boundary or choose_boundary()
+            self._parts = []
+            for name, value in fields:
+                field = RequestField.from_tuples(name, value)
+                header = f"--{self.boundary}\r\n{field.render_headers()}".encode("utf-8")
+                self._parts.append((header, field.data))
+            self._closing = f"--{self.boundary}--\r\n".encode("latin-1")
+            self._length = sum(len(header) + len(self._to_bytes(value)) + 2 for header, value in self._parts)
+            self._length += len(self._closing)
+
+        def __len__(self):
+            return self._length
+
+        def __iter__(self):
+            for header, value in self._parts:
+                yield header
+                yield self._to_bytes(value)
+                yield b"\r\n"
+            yield self._closing
+
+        def get_content_type(self) -> str:
+            return f"multipart/form-data; boundary={self.boundary}"
+
+        @staticmethod
+        def _to_bytes(value) -> bytes | memoryview:
+            if isinstance(value, bytes):
+                return value
+            elif isinstance(value, (bytearray, memoryview)):
+                return memoryview(value).cast("B")  # a flat view, so len() is the number of bytes
+            return str(value).encode("utf-8")
+
+    def encode_body(data) -> dict:
+        """
+        converts the parameters of a request into the body of a ``requests``-request
+
+        Small payloads of scalar values are url-encoded, larger ones and payloads containing ``bytes`` or files are
+        encoded as ``multipart/form-data``. Multipart-bodies larger than ``STREAM_MIN_SIZE`` are streamed.
+
+        :param data: a (possibly nested) ``dict`` or a ``list`` of ``(name, value)``-pairs
+        :return: the keyword-arguments (``data`` and ``headers``) for ``requests``
+        """
+        fields = flatten_fields(data)
+        size = _estimate_size(fields)
+        if all(_is_scalar(value) for _, value in fields) and size <= URLENCODED_MAX_SIZE:
+            return {
+                "data": urlencode(fields).encode("ascii"),
+                "headers": {"Content-Type": "application/x-www-form-urlencoded"},
+            }
+        if size < STREAM_MIN_SIZE:
+            from urllib3 import encode_multipart_formdata
+            payload_data, payload_header = encode_multipart_formdata(fields)
+            return {"data": payload_data, "headers": {"Content-Type": payload_header}}
+        body = MultipartStream(fields)
+        return {"data": body, "headers": {"Content-Type": body.get_content_type()}}
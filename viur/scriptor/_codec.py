@@ -0,0 +1,100 @@
+import json
+
+_name = None
+_loads = None
+
+
+def _load_codec(name: str):
+    if name == "orjson":
+        import orjson
+
+        return orjson.loads
+    elif name == "ujson":
+        import ujson
+
+        return ujson.loads
+    elif name == "json":
+        return json.loads
+    raise ValueError(f"""Unknown JSON-codec "{name}", supported are "orjson", "ujson" and "json".""")
+
+
+def set_json_codec(name: str = None, loads=None):
+    """
+    sets the JSON-codec used to parse the responses of the viur-backend and to read JSON-files
+
+    Without any parameter, the fastest available codec is chosen (orjson, then ujson, then the ``json``-module of the
+    standard library). JSON is always written by the ``json``-module, so the output doesn't depend on the codec.
+
+    :param name: one of ``"orjson"``, ``"ujson"`` or ``"json"``
+    :param loads: a custom function that parses ``bytes`` or ``str``, if set, ``name`` is only used as label
+    """
+    global _name, _loads
+    if loads is not None:
+        _name, _loads = name or "custom", loads
+        return
+    if name is not None:
+        _loads = _load_codec(name)
+        _name = name
+        return
+    for candidate in ("orjson", "ujson", "json"):
+        try:
+            _loads = _load_codec(candidate)
+        except ImportError:
+            continue
+        _name = candidate
+        return
+
+
+def get_json_codec() -> str:
+    """
+    returns the name of the JSON-codec in use
+
+    :return: the name of the codec
+    """
+    return _name
+
+
+def loads(data: bytes | str):
+    """
+    parses JSON with the configured codec, raises a ``ValueError`` on invalid JSON
+    """
+    return _loads(data)
+
+
+def dumps(obj, indent: int = None, sort_keys: bool = False) -> str:
+    """
+    serializes an object to JSON with the ``json``-module of the standard library
+
+    Written JSON is shown to users or stored in files, so it's produced the same way regardless of the codec (and
+    accepts everything the ``json``-module accepts, i.e. non-string keys).
+    """
+    return json.dumps(obj, indent=indent, sort_keys=sort_keys)
+
+
+_BINARY_TYPE_PREFIXES = ("image/", "audio/", "video/", "font/")
+_BINARY_TYPES = {
+    "application/octet-stream",
+    "application/pdf",
+    "application/zip",
+    "application/gzip",
+    "application/x-tar",
+    "application/msword",
+    "application/vnd.ms-excel",
+}
+
+
+def is_binary_content_type(content_type: str | None) -> bool:
+    """
+    returns ``True`` if a response with this ``Content-Type`` is clearly binary and can't contain JSON
+
+    Everything else (including ``text/html``, which viur sends for endpoints that don't set a ``Content-Type``) might
+    be JSON.
+    """
+    if not content_type:
+        return False
+    mime_type = content_type.split(";", 1)[0].strip().lower()
+    return (mime_type in _BINARY_TYPES or mime_type.startswith(_BINARY_TYPE_PREFIXES)
+            or mime_type.startswith("application/vnd.openxmlformats-"))
+
+
+set_json_codec()
@@ -0,0 +1,95 @@
+import hashlib
+import pathlib
+from ._utils import is_pyodide_context
+from . import _codec
+from .cache import CacheEntry
+
+if is_pyodide_context():
+    import js
+    from pyodide.ffi import JsException
+
+DEFAULT_DIRECTORY = pathlib.Path.home() / ".cache" / "viur-scriptor" / "config"
+CACHE_NAME = "viur-scriptor-config"
+
+
+class ConfigCache:
+    """
+    Keeps the module-catalogue (``/vi/config``) of the viur-backend between two runs of a script, on disk in native
+    Python and in the Cache-Storage of the browser in Pyodide.
+
+    :param directory: (native Python only) the directory of the files, ``~/.cache/viur-scriptor/config`` if omitted
+    :param ttl: the number of seconds the stored catalogue is used without asking the server, afterwards it's
+        revalidated with a conditional request
+    """
+
+    def __init__(self, directory: str | pathlib.Path = None, ttl: float = 3600.0):
+        self.directory = pathlib.Path(directory) if directory is not None else DEFAULT_DIRECTORY
+        self.ttl = ttl
+
+    def __repr__(self):
+        return f"""<{self.__class__.__name__} ttl={self.ttl}>"""
+
+    if is_pyodide_context():
+        async def load(self, url: str, username: str = None) -> CacheEntry | None:
+            """
+            returns the stored catalogue
+
+            :param url: the url of the catalogue
+            :param username: ignored in the browser, the catalogue of the logged-in user is stored
+            """
+            try:
+                cache = await js.caches.open(CACHE_NAME)
+                response = await cache.match(url)
+                if not response:
+                    return None
+                return CacheEntry.from_dict(_codec.loads(await response.text()))
+            except (JsException, ValueError, KeyError):
+                return None
+
+        async def save(self, url: str, username: str, entry: CacheEntry):
+            """
+            stores the catalogue
+
+            :param url: the url of the catalogue
+            :param username: ignored in the browser, the catalogue of the logged-in user is stored
+            :param entry: the response as ``CacheEntry``
+            """
+            try:
+                cache = await js.caches.open(CACHE_NAME)
+                await cache.put(url, js.Response.new(_codec.dumps(entry.to_dict())))
+            except JsException:
+                pass
+    else:
+        def _get_path(self, url: str, username: str | None) -> pathlib.Path:
+            key = f"""{username or ""}|{url}"""
+            return self.directory / f"""{hashlib.sha256(key.encode()).hexdigest()}.json"""
+
+        async def load(self, url: str, username: str = None) -> CacheEntry | None:
+            """
+            returns the stored catalogue
+
+            :param url: the url of the catalogue
+            :param username: the user the catalogue belongs to
+            """
+            path = self._get_path(url, username)
+            try:
+                return CacheEntry.from_dict(_codec.loads(path.read_bytes()))
+            except FileNotFoundError:
+                return None
+            except (ValueError, KeyError):
+                path.unlink(missing_ok=True)
+                return None
+
+        async def save(self, url: str, username: str, entry: CacheEntry):
+            """
+            stores the catalogue
+
+            :param url: the url of the catalogue
+            :param username: the user the catalogue belongs to
+            :param entry: the response as ``CacheEntry``
+            """
+            self.directory.mkdir(parents=True, exist_ok=True)
+            path = self._get_path(url, username)
+            tmp_path = path.with_suffix(".tmp")
+            tmp_path.write_text(_codec.dumps(entry.to_dict()))
+            tmp_path.replace(path)
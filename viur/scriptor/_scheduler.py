@@ -0,0 +1,90 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+
+
+class TokenBucket:
+    """
+    Limits the rate of requests with the token-bucket algorithm.
+
+    :param rate: the number of tokens (requests) added per second
+    :param burst: the maximum number of tokens that can be saved up, defaults to one second worth of tokens
+    """
+
+    def __init__(self, rate: float, burst: float = None):
+        assert rate > 0, "rate must be greater than 0"
+        self._rate = rate
+        self._capacity = burst if burst is not None else max(1.0, rate)
+        self._tokens = self._capacity
+        self._last = time.monotonic()
+
+    async def acquire(self):
+        """
+        takes a token out of the bucket, waits until one is available if the bucket is empty
+        """
+        now = time.monotonic()
+        self._tokens = min(self._capacity, self._tokens + (now - self._last) * self._rate)
+        self._last = now
+        # the token is reserved right away, so concurrent callers queue up behind each other
+        self._tokens -= 1
+        if self._tokens < 0:
+            await asyncio.sleep(-self._tokens / self._rate)
+
+
+class RequestScheduler:
+    """
+    Limits the number of requests that are in flight at the same time and the number of requests per second.
+
+    Both limits can be given as a single number, which applies to all requests, or as a ``dict`` mapping HTTP-methods
+    (i.e. ``"GET"`` or ``"SECURE_POST"``) to limits. The key ``"*"`` in such a ``dict`` is the limit for all requests,
+    the limits of a method apply in addition to it.
+
+    :param max_concurrency: the maximum number of requests in flight
+    :param rate_limit: the maximum number of requests per second
+    """
+
+    def __init__(self, max_concurrency: int | dict[str, int] = None, rate_limit: float | dict[str, float] = None):
+        self._semaphores = {
+            method: asyncio.Semaphore(limit)
+            for method, limit in self._normalize(max_concurrency).items()
+        }
+        self._buckets = {
+            method: TokenBucket(limit)
+            for method, limit in self._normalize(rate_limit).items()
+        }
+
+    @staticmethod
+    def _normalize(limits) -> dict:
+        if limits is None:
+            return {}
+        if isinstance(limits, dict):
+            return {method.upper(): limit for method, limit in limits.items() if limit}
+        return {"*": limits}
+
+    @staticmethod
+    def _lookup(limits: dict, method: str) -> list:
+        specific = limits.get(method)
+        if specific is None and method == "SECURE_POST":
+            specific = limits.get("POST")
+        return [limit for limit in (limits.get("*"), specific) if limit is not None]
+
+    @asynccontextmanager
+    async def slot(self, method: str):
+        """
+        waits until a request with the given method may be sent, the request has to be sent inside the
+        ``async with``-block
+
+        :param method: the HTTP-method of the request (``"SECURE_POST"`` is looked up before ``"POST"``)
+        """
+        semaphores = self._lookup(self._semaphores, method.upper())
+        acquired = []
+        try:
+            for semaphore in semaphores:
+                await semaphore.acquire()
+                acquired.append(semaphore)
+            for bucket in self._lookup(self._buckets, method.upper()):
+                await bucket.acquire()
+            yield
+        finally:
+            for semaphore in acquired:
+                semaphore.release()
@@ -0,0 +1,76 @@
+import hashlib
+import os
+import pathlib
+import time
+from . import _codec
+
+DEFAULT_DIRECTORY = pathlib.Path.home() / ".cache" / "viur-scriptor" / "sessions"
+
+
+class SessionCache:
+    """
+    Keeps the session-cookies of logged-in users on disk, one file per base-url and username (native Python only).
+
+    The files contain the cookies of the session (not the password) and are only readable by the current user.
+
+    :param directory: the directory of the files, ``~/.cache/viur-scriptor/sessions`` if omitted
+    :param max_age: the number of seconds after which stored cookies aren't used anymore
+    """
+
+    def __init__(self, directory: str | pathlib.Path = None, max_age: float = 7 * 24 * 3600):
+        self.directory = pathlib.Path(directory) if directory is not None else DEFAULT_DIRECTORY
+        self.max_age = max_age
+
+    def __repr__(self):
+        return f"""<{self.__class__.__name__} directory="{self.directory}">"""
+
+    def _get_path(self, base_url: str, username: str | None) -> pathlib.Path:
+        key = hashlib.sha256(f"""{base_url.rstrip("/")}|{username or ""}""".encode()).hexdigest()
+        return self.directory / f"""{key}.json"""
+
+    def load(self, base_url: str, username: str | None) -> dict | None:
+        """
+        returns the stored cookies
+
+        :param base_url: the base-url of the viur-backend
+        :param username: the username
+        :return: the cookies as ``dict`` or ``None`` if there are none (or they are too old)
+        """
+        path = self._get_path(base_url, username)
+        try:
+            data = _codec.loads(path.read_bytes())
+            if time.time() - data["saved_at"] > self.max_age:
+                raise ValueError("expired")
+            return data["cookies"] or None
+        except FileNotFoundError:
+            return None
+        except (ValueError, KeyError, TypeError):
+            path.unlink(missing_ok=True)
+            return None
+
+    def save(self, base_url: str, username: str | None, cookies: dict):
+        """
+        stores the cookies of a session
+
+        :param base_url: the base-url of the viur-backend
+        :param username: the username
+        :param cookies: the cookies as ``dict``
+        """
+        self.directory.mkdir(mode=0o700, parents=True, exist_ok=True)
+        path = self._get_path(base_url, username)
+        tmp_path = path.with_suffix(".tmp")
+        content = _codec.dumps({"base_url": base_url, "username": username, "cookies": cookies,
+                                "saved_at": time.time()})
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w") as f:
+            f.write(content)
+        tmp_path.replace(path)
+
+    def delete(self, base_url: str, username: str | None):
+        """
+        removes the stored cookies
+
+        :param base_url: the base-url of the viur-backend
+        :param username: the username
+        """
+        self._get_path(base_url, username).unlink(missing_ok=True)
@@ -0,0 +1,120 @@
+import asyncio
+import time
+from collections import deque
+from .http_errors import HTTPException
+
+_MAX_BATCH_SIZE = 100  # the most keys viur hands out per request
+
+
+class SkeyPool:
+    """
+    Keeps a pool of prefetched security-keys (skeys) for ``SECURE_POST``-requests.
+
+    Keys are fetched in batches (``/skey?amount=...``) and refilled in the background as soon as the pool runs low,
+    so a ``SECURE_POST`` usually doesn't have to wait for its own skey-request. Concurrent requests for keys while
+    the pool is empty share a single fetch.
+
+    The pool starts with a single key and doubles its size every time a further request has to wait for keys, up to
+    ``size``, so a script that sends only a few ``SECURE_POST``-requests doesn't fetch keys it never uses.
+
+    :param fetch: coroutine-function that takes the amount of keys to fetch and returns the server's response
+        (either a single key or a ``list`` of keys)
+    :param size: the maximum number of keys to keep in the pool
+    :param max_age: keys older than this (in seconds) are discarded instead of being used
+    """
+
+    def __init__(self, fetch, size: int = 10, max_age: float = 600):
+        self._fetch = fetch
+        self._max_size = max(1, size)
+        self._size = 1
+        self._used = False
+        self._grown = False
+        self._max_age = max_age
+        self._keys = deque()
+        self._pending = None
+        self._batch_supported = True
+
+    def __len__(self):
+        return len(self._keys)
+
+    async def acquire(self) -> str:
+        """
+        takes a key out of the pool, fetches new keys if the pool is empty
+
+        :return: an unused skey
+        """
+        while True:
+            self._discard_expired()
+            if self._keys:
+                break
+            if self._used and not self._grown:
+                # at most once per fetch, concurrent waiters share it
+                self._size = min(self._size * 2, self._max_size)
+                self._grown = True
+            await self._refill()
+        self._used = True
+        key = self._keys.popleft()[1]
+        if self._size > 1 and len(self._keys) <= self._size // 2:
+            self._start_refill()
+        return key
+
+    def invalidate(self):
+        """
+        discards all pooled keys, i.e. after the server rejected a key or the session changed
+        """
+        self._keys.clear()
+
+    async def prefetch(self, amount: int = None):
+        """
+        fills the pool up to ``amount`` keys (at least the pool-size), intended to be called before a burst of
+        ``SECURE_POST``-requests
+
+        :param amount: the number of keys that should be available
+        """
+        amount = max(self._size, amount or 0)
+        while len(self._keys) < amount:
+            available = len(self._keys)
+            await self._refill(amount - available)
+            if len(self._keys) <= available:
+                break
+
+    def _discard_expired(self):
+        if self._max_age is None:
+            return
+        oldest_allowed = time.monotonic() - self._max_age
+        while self._keys and self._keys[0][0] < oldest_allowed:
+            self._keys.popleft()
+
+    def _start_refill(self, amount: int = None):
+        if self._pending is None:
+            self._pending = asyncio.ensure_future(self._fetch_keys(amount or self._size))
+            self._pending.add_done_callback(self._on_refill_done)
+        return self._pending
+
+    def _on_refill_done(self, task):
+        self._pending = None
+        self._grown = False
+        if not task.cancelled():
+            task.exception()  # marks the exception as retrieved, waiting callers still get it raised
+
+    async def _refill(self, amount: int = None):
+        await asyncio.shield(self._start_refill(amount))
+
+    async def _fetch_keys(self, amount: int):
+        amount = min(amount, _MAX_BATCH_SIZE)
+        if amount > 1 and self._batch_supported:
+            try:
+                result = await self._fetch(amount)
+            except HTTPException as e:
+                if e.status not in (400, 404, 405):
+                    raise  # a temporary error, the retry-policy has already been applied
+                self._batch_supported = False
+                result = await self._fetch(1)
+        else:
+            result = await self._fetch(1)
+        if isinstance(result, str):
+            if amount > 1:
+                self._batch_supported = False  # the server ignored the amount
+            result = [result]
+        fetched_at = time.monotonic()
+        self._keys.extend((fetched_at, key) for key in result)
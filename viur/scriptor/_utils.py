@@ -1,10 +1,8 @@
 import os
 from io import StringIO, BytesIO
-import openpyxl
 from csv import writer as CSVWriter
 from zipfile import ZipFile, ZIP_DEFLATED
 import datetime
-from openpyxl.writer.excel import ExcelWriter
 from collections import Counter
 import pathlib
 
@@ -30,10 +28,44 @@ def is_pyodide_in_browser():
 
 
 if is_pyodide_context():
+    import asyncio
+
+    _RESULT_POLL_INTERVAL_MS = 250  # only used until the host calls resolve_result for the first time
+    _pending_result = None
+    _host_resolves_results = False
+
+    def resolve_result(value):
+        """
+        hands the result of a dialog to the script, called by the host (the scriptor-frontend) when the user answered
+
+        The waiting dialog is resumed immediately. After the first call, dialogs don't check ``manager.resultValue``
+        anymore and only wait for ``resolve_result``. A result that arrives while no dialog is waiting (i.e. a late or
+        duplicate answer) is dropped, so it can't be taken for the answer of a later dialog.
+
+        :param value: the result of the dialog, passed on unchanged (i.e. a file-handle stays a ``JsProxy``)
+        """
+        global _pending_result, _host_resolves_results
+        _host_resolves_results = True
+        if _pending_result is not None and not _pending_result.done():
+            _pending_result.set_result(value)
+        _pending_result = None
+
     async def _wait_for_result():
-        while manager.resultValue is None:
-            await manager.sleep(250)
-        res = manager.resultValue
+        global _pending_result
+        from . import tracing
+        with tracing.span("wait for dialog", "dialog"):
+            future = _pending_result = asyncio.get_event_loop().create_future()
+            try:
+                if _host_resolves_results:
+                    await future
+                while not future.done() and manager.resultValue is None:
+                    sleeper = asyncio.ensure_future(manager.sleep(_RESULT_POLL_INTERVAL_MS))
+                    await asyncio.wait([future, sleeper], return_when=asyncio.FIRST_COMPLETED)
+                    sleeper.cancel()
+            finally:
+                if _pending_result is future:
+                    _pending_result = None
+            res = future.result() if future.done() else manager.resultValue
         if res == "__exit__":
             import sys
             sys.exit(0)
@@ -116,6 +148,8 @@ def list_to_csv(data, header=None, delimiter=','):
 
 
 def list_to_excel(data):
+    import openpyxl
+    from openpyxl.writer.excel import ExcelWriter
     workbook = openpyxl.Workbook()
     sheet = workbook.active
     for d in data:
@@ -158,10 +192,7 @@ if is_pyodide_context():
     def save_file(data: bytes, filename: str = "file.bin"):
         js.self.postMessage(
             type="download",
-            blob=js.Blob.new(
-                [js.Uint8Array.new(data).buffer],
-                {type: 'application/octet-stream'}
-            ),
+            blob=bytes_to_blob(data),
             filename=filename
         )
 else:
@@ -281,16 +312,166 @@ async def gather_async_iterator(async_iterator):
     return result
 
 
+def read_ahead(async_iterator, size: int):
+    """
+    iterates an asynchronous iterator in a background-task, up to ``size`` items are fetched before they are consumed
+
+    The background-task starts immediately (so this must be called while the event-loop is running) and is cancelled
+    when the returned iterator is closed, exceptions are raised to the consumer.
+
+    :param async_iterator: the iterator that should be read ahead
+    :param size: the maximum number of buffered items
+    :return: an asynchronous iterator with the content of ``async_iterator``
+    """
+    import asyncio
+    queue = asyncio.Queue(maxsize=size)
+
+    async def produce():
+        async for item in async_iterator:
+            await queue.put(item)
+
+    return ConsumeQueue(queue, [asyncio.ensure_future(produce())], [async_iterator])
+
+
+class ConsumeQueue:
+    """
+    yields the items that the tasks put into the queue until all tasks are done, the exception of a failed task is
+    raised once the items before it have been yielded
+
+    The tasks are cancelled and the iterators closed when the iterator is closed with ``aclose``, even if it has
+    never been iterated.
+
+    :param queue: the ``asyncio.Queue`` the tasks put their items into
+    :param tasks: the producing tasks
+    :param async_iterators: iterators that are closed at the end
+    """
+
+    def __init__(self, queue, tasks: list, async_iterators: list = ()):
+        self._queue = queue
+        self._tasks = tasks
+        self._async_iterators = async_iterators
+        self._closed = False
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        import asyncio
+        while True:
+            if not self._queue.empty():
+                return self._queue.get_nowait()
+            for task in self._tasks:
+                if task.done() and not task.cancelled() and task.exception() is not None:
+                    raise task.exception()
+            pending = [task for task in self._tasks if not task.done()]
+            if not pending:
+                raise StopAsyncIteration
+            getter = asyncio.ensure_future(self._queue.get())
+            try:
+                await asyncio.wait([getter, *pending], return_when=asyncio.FIRST_COMPLETED)
+            except BaseException:
+                getter.cancel()
+                raise
+            if getter.done():
+                return getter.result()
+            getter.cancel()
+
+    async def aclose(self):
+        import asyncio
+        if self._closed:
+            return
+        self._closed = True
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        for async_iterator in self._async_iterators:
+            if hasattr(async_iterator, "aclose"):
+                await async_iterator.aclose()
+
+
+async def map_concurrently(func, items, concurrency: int = 10, ordered: bool = True):
+    """
+    calls the coroutine-function ``func`` for every item, with at most ``concurrency`` calls running at the same time
+
+    Items are taken from ``items`` only when a call can be started, so an iterator of unknown (or infinite) length
+    doesn't have to be loaded into memory. In ordered mode, a slow call holds back the following results until it's
+    done, but not new calls: the results that are done in the meantime are kept in memory.
+
+    :param func: the coroutine-function that is called with every item
+    :param items: an iterable or asynchronous iterable of items
+    :param concurrency: the maximum number of calls running at the same time
+    :param ordered: if true, the results are yielded in the order of the items, otherwise as soon as they are done
+    :return: an asynchronous iterator of ``(item, result)``-tuples, ``result`` is the exception if the call failed
+    """
+    import asyncio
+    from collections import deque
+    assert concurrency > 0, "concurrency must be positive"
+    if hasattr(items, "__aiter__"):
+        async_iterator = items.__aiter__()
+        iterator = None
+    else:
+        async_iterator = None
+        iterator = iter(items)
+
+    async def call(item):
+        try:
+            return item, await func(item)
+        except Exception as e:
+            return item, e
+
+    running = deque()  # in the order of the items, until their results have been yielded
+    active = set()  # the calls that haven't finished yet
+    exhausted = False
+    try:
+        while True:
+            while not exhausted and len(active) < concurrency:
+                try:
+                    item = await async_iterator.__anext__() if async_iterator else next(iterator)
+                except (StopIteration, StopAsyncIteration):
+                    exhausted = True
+                    break
+                task = asyncio.ensure_future(call(item))
+                running.append(task)
+                active.add(task)
+            if not running:
+                return
+            if active:
+                _, active = await asyncio.wait(active, return_when=asyncio.FIRST_COMPLETED)
+            if ordered:
+                while running and running[0].done():
+                    yield running.popleft().result()
+            else:
+                for task in [task for task in running if task.done()]:
+                    running.remove(task)
+                    yield task.result()
+    finally:
+        for task in running:
+            task.cancel()
+        await asyncio.gather(*running, return_exceptions=True)
+
+
 if is_pyodide_context():
-    def bytes_to_blob(b: bytes):
-        length = len(b)
-        buffer = js.eval(f"new Uint8Array({length})")
-        for index, value in enumerate(b):
-            buffer[index] = value
-        buffer.__len__ = lambda: length
-        buffer.buffer.__len__ = lambda: length
-        blob = js.Blob.new([buffer.buffer], {type: 'application/octet-stream'})
-        return blob
+    def bytes_to_blob(data: bytes | bytearray | memoryview, mime_type: str = "application/octet-stream"):
+        """
+        creates a JS-``Blob`` from binary data
+
+        The ``Blob`` is created from a view into the memory of Python, so the data is copied only once (by the
+        ``Blob``-constructor) instead of being converted byte by byte.
+
+        :param data: the data as ``bytes``, ``bytearray`` or ``memoryview``
+        :param mime_type: the type of the ``Blob``
+        :return: the ``Blob``
+        """
+        options = pyodide.ffi.to_js({"type": mime_type}, dict_converter=js.Object.fromEntries)
+        proxy = pyodide.ffi.create_proxy(memoryview(data))
+        try:
+            buffer = proxy.getBuffer("u8")
+            try:
+                return js.Blob.new([buffer.data], options)
+            finally:
+                buffer.release()
+        finally:
+            proxy.destroy()
 
 if is_pyodide_context():
     def clear_console(length=0):
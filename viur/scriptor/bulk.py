@@ -0,0 +1,67 @@
+import time
+
+
+class BulkResult:
+    """
+    The results of a bulk-operation like ``edit_many``, in the order of the input.
+
+    Every entry is an ``(item, result)``-tuple, ``result`` is the response of the backend or the exception if the
+    request failed. A record the backend rejected (i.e. because of invalid values) is a response, not an exception.
+
+    :param operation: the name of the operation, i.e. ``"person.edit_many"``
+    """
+
+    def __init__(self, operation: str):
+        self.operation = operation
+        self.items = []
+        self.results = []
+        self.duration = 0.0
+        self._started = time.perf_counter()
+
+    def __len__(self):
+        return len(self.results)
+
+    def __iter__(self):
+        return iter(zip(self.items, self.results))
+
+    def __getitem__(self, index: int):
+        return self.items[index], self.results[index]
+
+    def __repr__(self):
+        return f"""<{self.__class__.__name__} {self.report()}>"""
+
+    def append(self, item, result):
+        self.items.append(item)
+        self.results.append(result)
+
+    def finish(self):
+        self.duration = time.perf_counter() - self._started
+
+    @property
+    def errors(self) -> list[tuple[int, object, Exception]]:
+        """
+        the failed items as ``(index, item, exception)``-tuples
+        """
+        return [(index, self.items[index], result) for index, result in enumerate(self.results)
+                if isinstance(result, Exception)]
+
+    @property
+    def succeeded(self) -> int:
+        """
+        the number of items whose request didn't fail
+        """
+        return len(self.results) - len(self.errors)
+
+    @property
+    def per_second(self) -> float:
+        """
+        the number of processed items per second
+        """
+        return len(self.results) / self.duration if self.duration else 0.0
+
+    def report(self) -> str:
+        """
+        returns a summary of the operation, i.e. ``"person.edit_many: 1000 items in 12.3 s (81.3/s), 2 failed"``
+        """
+        return (f"""{self.operation}: {len(self.results)} items in {self.duration:.1f} s """
+                f"""({self.per_second:.1f}/s), {len(self.errors)} failed""")
@@ -0,0 +1,198 @@
+import base64
+import hashlib
+import pathlib
+import time
+from collections import OrderedDict
+from ._utils import is_pyodide_context
+from . import _codec
+from .requests import WebResponse
+
+
+class CacheEntry:
+    """
+    A cached response of a ``GET``-request.
+    """
+
+    def __init__(self, url: str, module: str, content: bytes, headers: dict, stored_at: float = None):
+        self.url = url
+        self.module = module
+        self.content = content
+        self.headers = headers
+        self.stored_at = time.time() if stored_at is None else stored_at
+
+    def __repr__(self):
+        return f"""<{self.__class__.__name__} url="{self.url}", size={len(self.content)}>"""
+
+    def is_fresh(self, ttl: float) -> bool:
+        """
+        returns ``True`` if the entry is younger than ``ttl`` seconds
+        """
+        return time.time() - self.stored_at < ttl
+
+    def get_validators(self) -> dict:
+        """
+        returns the headers for a conditional request that revalidates this entry
+        """
+        validators = {}
+        if etag := self.headers.get("etag"):
+            validators["If-None-Match"] = etag
+        if last_modified := self.headers.get("last-modified"):
+            validators["If-Modified-Since"] = last_modified
+        return validators
+
+    def to_response(self) -> WebResponse:
+        """
+        returns the cached response as ``WebResponse``
+        """
+        return WebResponse(url=self.url, http_status_code=200, content=self.content, headers=self.headers)
+
+    def to_dict(self) -> dict:
+        return {
+            "url": self.url,
+            "module": self.module,
+            "content": base64.b64encode(self.content).decode("ascii"),
+            "headers": self.headers,
+            "stored_at": self.stored_at,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict):
+        return cls(
+            url=data["url"],
+            module=data["module"],
+            content=base64.b64decode(data["content"]),
+            headers=data["headers"],
+            stored_at=data["stored_at"],
+        )
+
+
+class ResponseCache:
+    """
+    Caches the responses of ``GET``-requests to the viur-backend.
+
+    Entries are used for ``ttl`` seconds. Afterwards, entries with an ``ETag``- or ``Last-Modified``-header are
+    revalidated with a conditional request, all others are fetched again. If the cache holds more than
+    ``max_entries`` entries, the least recently used ones are dropped. Whenever a module is changed (by any request
+    other than ``GET``, i.e. ``edit``, ``add``, ``delete`` or ``move``), all entries of that module are dropped.
+
+    In native Python, the cache can additionally be kept on disk, so the entries survive the end of the script.
+
+    :param ttl: the number of seconds an entry is used without asking the server
+    :param max_entries: the maximum number of entries kept in memory
+    :param directory: (native Python only) a directory where the entries are kept on disk
+    :param exclude_modules: the modules whose responses are never cached
+    """
+
+    def __init__(self, ttl: float = 60.0, max_entries: int = 256, directory: str | pathlib.Path = None,
+                 exclude_modules: tuple[str, ...] = ("skey",)):
+        if directory is not None and is_pyodide_context():
+            raise ValueError("The on-disk cache is not available in the browser.")
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.exclude_modules = frozenset(exclude_modules)
+        self._entries = OrderedDict()
+        self._directory = None
+        if directory is not None:
+            self._directory = pathlib.Path(directory)
+            self._directory.mkdir(parents=True, exist_ok=True)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __repr__(self):
+        return f"""<{self.__class__.__name__} entries={len(self._entries)}, ttl={self.ttl}>"""
+
+    def is_cacheable(self, module: str | None) -> bool:
+        """
+        returns ``True`` if responses of this module may be cached
+
+        :param module: the name of the module
+        """
+        return bool(module) and module not in self.exclude_modules
+
+    def get(self, key: str) -> CacheEntry | None:
+        """
+        returns the entry for ``key``, even if it isn't fresh anymore
+
+        :param key: the cache-key of the request
+        :return: the ``CacheEntry`` or ``None``
+        """
+        entry = self._entries.get(key)
+        if entry is None and self._directory is not None:
+            entry = self._read_from_disk(key)
+            if entry is not None:
+                self._store_in_memory(key, entry)
+        if entry is not None:
+            self._entries.move_to_end(key)
+        return entry
+
+    def put(self, key: str, module: str, response: WebResponse) -> CacheEntry:
+        """
+        stores a response
+
+        :param key: the cache-key of the request
+        :param module: the module the request belongs to
+        :param response: the ``WebResponse`` to store
+        :return: the new ``CacheEntry``
+        """
+        entry = CacheEntry(url=response.get_url(), module=module, content=response.get_content(),
+                           headers=response.get_headers())
+        self._store_in_memory(key, entry)
+        if self._directory is not None:
+            self._write_to_disk(key, entry)
+        return entry
+
+    def touch(self, key: str):
+        """
+        marks an entry as fresh again, i.e. after the server confirmed it's still valid
+
+        :param key: the cache-key of the request
+        """
+        if entry := self._entries.get(key):
+            entry.stored_at = time.time()
+            if self._directory is not None:
+                self._write_to_disk(key, entry)
+
+    def invalidate_module(self, module: str):
+        """
+        drops all entries of a module
+
+        :param module: the name of the module
+        """
+        for key in [key for key, entry in self._entries.items() if entry.module == module]:
+            del self._entries[key]
+        if self._directory is not None:
+            for path in self._directory.glob(f"{module}-*.json"):
+                path.unlink(missing_ok=True)
+
+    def clear(self):
+        """
+        drops all entries
+        """
+        self._entries.clear()
+        if self._directory is not None:
+            for path in self._directory.glob("*.json"):
+                path.unlink(missing_ok=True)
+
+    def _store_in_memory(self, key: str, entry: CacheEntry):
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _get_path(self, key: str, module: str = "*") -> pathlib.Path:
+        return self._directory / f"""{module}-{hashlib.sha256(key.encode()).hexdigest()}.json"""
+
+    def _read_from_disk(self, key: str) -> CacheEntry | None:
+        for path in self._directory.glob(self._get_path(key).name):
+            try:
+                return CacheEntry.from_dict(_codec.loads(path.read_bytes()))
+            except (ValueError, KeyError):
+                path.unlink(missing_ok=True)
+        return None
+
+    def _write_to_disk(self, key: str, entry: CacheEntry):
+        path = self._get_path(key, entry.module)
+        tmp_path = path.with_suffix(".tmp")
+        tmp_path.write_text(_codec.dumps(entry.to_dict()))
+        tmp_path.replace(path)
@@ -0,0 +1,241 @@
+import asyncio
+import base64
+import gzip
+import pathlib
+import time
+from collections import defaultdict, deque
+from ._utils import is_pyodide_context
+from . import _codec
+from .requests import WebRequest, WebResponse, WebStreamResponse
+
+CASSETTE_VERSION = 1
+
+
+class CassetteError(LookupError):
+    """
+    raised while replaying, if a request has no recorded response
+    """
+
+
+class _ReplayedStreamResponse(WebStreamResponse):
+    def __init__(self, url, http_status_code, headers: dict, content: bytes):
+        super().__init__(url=url, http_status_code=http_status_code, headers=headers, raw_response=None)
+        self._content = content
+
+    async def iter_chunks(self, chunk_size: int = 65536):
+        if self._closed:
+            raise RuntimeError("This response is already closed.")
+        try:
+            for start in range(0, len(self._content), chunk_size):
+                yield self._content[start:start + chunk_size]
+        finally:
+            await self.close()
+
+    async def close(self):
+        self._closed = True
+
+
+class Interaction:
+    """
+    A recorded request and its response.
+    """
+
+    __slots__ = ("method", "url", "status", "headers", "content", "started", "elapsed")
+
+    def __init__(self, method: str, url: str, status: int, headers: dict, content: bytes, started: float = 0.0,
+                 elapsed: float = 0.0):
+        self.method = method
+        self.url = url
+        self.status = status
+        self.headers = headers
+        self.content = content
+        self.started = started
+        self.elapsed = elapsed
+
+    def __repr__(self):
+        return f"""<{self.__class__.__name__} {self.method} "{self.url}", status={self.status}>"""
+
+    def to_dict(self) -> dict:
+        return {
+            "method": self.method,
+            "url": self.url,
+            "status": self.status,
+            "headers": self.headers,
+            "content": base64.b64encode(self.content).decode("ascii"),
+            "started": round(self.started, 6),
+            "elapsed": round(self.elapsed, 6),
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict):
+        return cls(
+            method=data["method"],
+            url=data["url"],
+            status=data["status"],
+            headers=data["headers"],
+            content=base64.b64decode(data["content"]),
+            started=data.get("started", 0.0),
+            elapsed=data.get("elapsed", 0.0),
+        )
+
+
+class Cassette:
+    """
+    Records the requests sent through ``WebRequest.request`` (all requests to the viur-backend and the uploads in
+    native Python) together with their responses and timing, and answers them from the recording later. This way a
+    script can be profiled repeatedly with real payloads without sending a single request to the backend.
+
+    Recorded responses are matched by method and url, identical requests get the recorded responses in the order
+    they were recorded. The request bodies aren't compared, so a replayed run must send the requests in a similar order.
+
+    .. code-block:: python
+
+        cassette = Cassette(mode="record")
+        with cassette:
+            await export_module("person")
+        cassette.save("person-export.cassette")
+
+        with Cassette.load("person-export.cassette", speed=4):
+            await export_module("person")  # four times faster than recorded, without the backend
+
+    :param mode: ``"record"`` or ``"replay"``
+    :param interactions: the recorded ``Interaction``\\ s to replay
+    :param speed: (replay only) ``None`` answers instantly, otherwise every response is delayed by its recorded
+        duration divided by ``speed``, i.e. ``1`` for the recorded speed or ``10`` to run ten times faster
+    :param passthrough: (replay only) if true, requests without recorded response are sent to the server instead
+        of raising a ``CassetteError``
+    """
+
+    def __init__(self, mode: str = "record", interactions: list[Interaction] = None, speed: float | None = None,
+                 passthrough: bool = False):
+        if mode not in ("record", "replay"):
+            raise ValueError(f"""mode must be "record" or "replay", not "{mode}".""")
+        self.mode = mode
+        self.speed = speed
+        self.passthrough = passthrough
+        self.interactions = list(interactions or [])
+        self._queues = defaultdict(deque)
+        for interaction in self.interactions:
+            self._queues[(interaction.method, interaction.url)].append(interaction)
+        self._origin = time.perf_counter()
+        self._previous_cassette = None
+
+    def __len__(self):
+        return len(self.interactions)
+
+    def __repr__(self):
+        return f"""<{self.__class__.__name__} mode="{self.mode}", interactions={len(self.interactions)}>"""
+
+    def __enter__(self):
+        self._previous_cassette = WebRequest.get_cassette()
+        WebRequest.set_cassette(self)
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        WebRequest.set_cassette(self._previous_cassette)
+        self._previous_cassette = None
+
+    def get_remaining(self) -> int:
+        """
+        returns the number of recorded responses that haven't been replayed yet
+        """
+        return sum(len(queue) for queue in self._queues.values())
+
+    async def handle(self, transport, method: str, url: str, **kwargs):
+        """
+        answers a request from ``WebRequest.request``
+
+        :param transport: the function that sends the request to the server
+        :param method: the HTTP-method
+        :param url: the url of the request
+        :param kwargs: the parameters of the request
+        :return: ``WebResponse`` (or ``WebStreamResponse`` if ``stream`` is true)
+        """
+        method = method.upper()
+        stream = kwargs.get("stream", False)
+        if self.mode == "replay":
+            queue = self._queues.get((method, url))
+            if queue:
+                return await self._replay(queue.popleft(), stream)
+            if not self.passthrough:
+                raise CassetteError(f"""No recorded response for {method} "{url}".""")
+            return await transport(method, url, **kwargs)
+        started = time.perf_counter()
+        response = await transport(method, url, **kwargs)
+        if stream:
+            response = await response.read()
+        interaction = Interaction(
+            method=method,
+            url=url,
+            status=response.get_status_code(),
+            headers=dict(response.get_headers()),
+            content=response.get_content(),
+            started=started - self._origin,
+            elapsed=time.perf_counter() - started,
+        )
+        self.interactions.append(interaction)
+        return self._to_response(interaction, stream)
+
+    async def _replay(self, interaction: Interaction, stream: bool):
+        if self.speed:
+            await asyncio.sleep(interaction.elapsed / self.speed)
+        return self._to_response(interaction, stream)
+
+    @staticmethod
+    def _to_response(interaction: Interaction, stream: bool):
+        if stream:
+            return _ReplayedStreamResponse(url=interaction.url, http_status_code=interaction.status,
+                                           headers=interaction.headers, content=interaction.content)
+        return WebResponse(url=interaction.url, http_status_code=interaction.status, content=interaction.content,
+                           headers=interaction.headers)
+
+    def to_bytes(self) -> bytes:
+        """
+        returns the recording as gzip-compressed JSON
+        """
+        data = {"version": CASSETTE_VERSION, "interactions": [i.to_dict() for i in self.interactions]}
+        return gzip.compress(_codec.dumps(data).encode("utf-8"))
+
+    @classmethod
+    def from_bytes(cls, data: bytes, speed: float | None = None, passthrough: bool = False):
+        """
+        creates a ``Cassette`` that replays a recording created with ``to_bytes``
+
+        :param data: the recording
+        :param speed: see ``Cassette``
+        :param passthrough: see ``Cassette``
+        """
+        content = _codec.loads(gzip.decompress(data))
+        if content.get("version") != CASSETTE_VERSION:
+            raise ValueError(f"""Unsupported cassette-version {content.get("version")}.""")
+        interactions = [Interaction.from_dict(interaction) for interaction in content["interactions"]]
+        return cls(mode="replay", interactions=interactions, speed=speed, passthrough=passthrough)
+
+    def to_file(self, filename: str = "requests.cassette"):
+        """
+        returns the recording as ``File``, i.e. to download it in the browser
+
+        :param filename: the name of the file
+        """
+        from .file import File
+        return File(self.to_bytes(), filename)
+
+    if not is_pyodide_context():
+        def save(self, path: str | pathlib.Path):
+            """
+            writes the recording to a file (native Python only)
+
+            :param path: the path of the file
+            """
+            pathlib.Path(path).write_bytes(self.to_bytes())
+
+        @classmethod
+        def load(cls, path: str | pathlib.Path, speed: float | None = None, passthrough: bool = False):
+            """
+            creates a ``Cassette`` that replays a recording saved with ``save`` (native Python only)
+
+            :param path: the path of the file
+            :param speed: see ``Cassette``
+            :param passthrough: see ``Cassette``
+            """
+            return cls.from_bytes(pathlib.Path(path).read_bytes(), speed=speed, passthrough=passthrough)
@@ -0,0 +1,102 @@
+import pathlib
+from ._utils import is_pyodide_context
+from . import _codec
+
+
+class ListCursor:
+    """
+    The position of an iteration over ``list``, owned by that iteration. It's updated while the records are consumed
+    and can be stored, i.e. after every processed record, to continue an interrupted iteration later.
+
+    .. code-block:: python
+
+        cursor = ListCursor()
+        async for entry in person.list(params={"limit": 100}, cursor=cursor):
+            await process(entry)
+            cursor.save("person.cursor")
+
+        # after a crash
+        async for entry in person.list(cursor=ListCursor.load("person.cursor")):
+            await process(entry)
+
+    The query (url and parameters) is stored in the cursor on its first use, a resumed iteration continues the stored
+    query and ignores the ``params`` passed to ``list``. A record counts as consumed as soon as it's yielded, a resumed
+    iteration continues with the following record. A cursor that is stored after processing a record, like above,
+    still points before the record whose processing was interrupted, so that record is yielded again.
+
+    :param url: the url of the list-request
+    :param params: the parameters of the list-request (without the cursor of the backend)
+    :param renderer: the renderer of the list-request
+    :param page_cursor: the cursor of the backend the current page was requested with, ``None`` for the first page
+    :param offset: the number of records of the current page that have been consumed
+    :param done: if true, all records have been consumed
+    """
+
+    def __init__(self, url: str = None, params: dict = None, renderer: str = "", page_cursor: str = None,
+                 offset: int = 0, done: bool = False):
+        self.url = url
+        self.params = params
+        self.renderer = renderer
+        self.page_cursor = page_cursor
+        self.offset = offset
+        self.done = done
+
+    def __repr__(self):
+        return f"""<{self.__class__.__name__} url="{self.url}", offset={self.offset}, done={self.done}>"""
+
+    def to_dict(self) -> dict:
+        return {
+            "url": self.url,
+            "params": self.params,
+            "renderer": self.renderer,
+            "page_cursor": self.page_cursor,
+            "offset": self.offset,
+            "done": self.done,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict):
+        return cls(
+            url=data["url"],
+            params=data["params"],
+            renderer=data.get("renderer", ""),
+            page_cursor=data.get("page_cursor"),
+            offset=data.get("offset", 0),
+            done=data.get("done", False),
+        )
+
+    def dumps(self) -> str:
+        """
+        returns the cursor as JSON-string
+        """
+        return _codec.dumps(self.to_dict())
+
+    @classmethod
+    def loads(cls, data: str | bytes):
+        """
+        creates a cursor from a JSON-string created with ``dumps``
+
+        :param data: the JSON-string
+        """
+        return cls.from_dict(_codec.loads(data))
+
+    if not is_pyodide_context():
+        def save(self, path: str | pathlib.Path):
+            """
+            writes the cursor to a file (native Python only)
+
+            :param path: the path of the file
+            """
+            path = pathlib.Path(path)
+            tmp_path = path.with_suffix(path.suffix + ".tmp")
+            tmp_path.write_text(self.dumps())
+            tmp_path.replace(path)
+
+        @classmethod
+        def load(cls, path: str | pathlib.Path):
+            """
+            creates a cursor from a file written with ``save`` (native Python only)
+
+            :param path: the path of the file
+            """
+            return cls.loads(pathlib.Path(path).read_text())
@@ -1,3 +1,4 @@
+# imported on first use of a dialog, so prompt_toolkit isn't loaded at startup
 from viur.scriptor._utils import is_pyodide_context
 
 if not is_pyodide_context():
@@ -26,12 +27,26 @@ if not is_pyodide_context():
             if not document.text:
                 raise ValidationError(message="You need to enter text. An empty string is not allowed.")
 
-
     class _FileDoesntExistsOrShouldBeReplacedValidator(Validator):
         def validate(self, document):
             text = document.text
             if not text.strip():
                 raise ValidationError(message="Please enter a filename.")
             if os.path.exists(text) and not text.endswith('!'):
-                raise ValidationError(
-                    message="This file already exists. If you want to replace it, add an exclamation-mark (!) at the end.")
+                raise ValidationError(message="This file already exists. "
+                                              "If you want to replace it, add an exclamation-mark (!) at the end.")
+
+    class _FileExistsValidator(Validator):
+        def validate(self, document):
+            text = document.text
+            if not text.strip():
+                raise ValidationError(message="Please enter a valid filename.")
+            if not os.path.exists(text):
+                raise ValidationError(message="A file with this name doesn't exist.")
+
+    class DirectoryExistsOrShouldBeCreatedValidator(Validator):
+        def validate(self, document):
+            text = document.text
+            if not os.path.isdir(text) and not text.endswith('!'):
+                raise ValidationError(message="This directory is not valid. If you want to try to create it, "
+                                              "add an exclamation-mark (!) at the end.")
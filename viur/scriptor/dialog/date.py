@@ -7,9 +7,6 @@ if is_pyodide_context():
     import pyodide
     import js
     from viur.scriptor._utils import _wait_for_result
-else:
-    import prompt_toolkit
-    from ._validators import _ConvertableValidator
 
 if is_pyodide_context():
     async def date(
@@ -88,6 +85,8 @@ else:
         """
         if image:
             print(f"In the Browser, an image would have been shown here: {image}")
+        import prompt_toolkit
+        from ._validators import _ConvertableValidator
         validator = _ConvertableValidator(
             conversion_function=datetime.datetime.fromisoformat,
             error_message="Please enter a valid date."
@@ -1,5 +1,5 @@
 from viur.scriptor._utils import is_pyodide_context
-import json
+from viur.scriptor import _codec
 if is_pyodide_context():
     import js
     from viur.scriptor._utils import _wait_for_result
@@ -32,14 +32,14 @@ if is_pyodide_context():
             "type": "multiple-dialog",
             "title": title,
             "buttonText": send_button_text,
-            "components": json.dumps(components)
+            "components": _codec.dumps(components)
         }
 
         if not reuse:
             js.self.postMessage(**msg)
         res = await _wait_for_result()
         if isinstance(res, str):
-            return json.loads(res)
+            return _codec.loads(res)
         else:
             return res.to_py()
 
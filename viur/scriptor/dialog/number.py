@@ -4,9 +4,6 @@ import typing
 if is_pyodide_context():
     import js
     from viur.scriptor._utils import _wait_for_result
-else:
-    import prompt_toolkit
-    from ._validators import _ConvertableValidator
 # todo placeholder
 if is_pyodide_context():
     async def number(prompt: str = None, title: str = "Number Input", placeholder: str = None, image=None,
@@ -68,6 +65,8 @@ else:
             print(f"In the Browser, an image would have been shown here: {image}")
         if prompt is None:
             prompt = "Please enter a number: "
+        import prompt_toolkit
+        from ._validators import _ConvertableValidator
         validator = _ConvertableValidator(conversion_function=float, error_message="Please enter a number.")
         res = await prompt_toolkit.PromptSession().prompt_async(
             prompt,
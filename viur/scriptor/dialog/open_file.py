@@ -6,21 +6,6 @@ if is_pyodide_context():
     import pyodide
     import js
     from viur.scriptor._utils import _wait_for_result
-else:
-    import os
-    import prompt_toolkit
-    from prompt_toolkit.completion import PathCompleter, FuzzyCompleter
-    from prompt_toolkit.validation import Validator, ValidationError
-
-
-    class _FileExistsValidator(Validator):
-
-        def validate(self, document):
-            text = document.text
-            if not text.strip():
-                raise ValidationError(message="Please enter a valid filename.")
-            if not os.path.exists(text):
-                raise ValidationError(message="A file with this name doesn't exist.")
 
 if is_pyodide_context():
 
@@ -38,6 +23,9 @@ if is_pyodide_context():
 else:
 
     async def _open_file_dialog(prompt=None, types=[]):
+        import prompt_toolkit
+        from prompt_toolkit.completion import PathCompleter, FuzzyCompleter
+        from ._validators import _FileExistsValidator
         if prompt is None:
             prompt = "Please enter a filename to open:"
         prompt += ' '
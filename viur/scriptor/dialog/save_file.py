@@ -3,10 +3,6 @@ from viur.scriptor._utils import is_pyodide_context
 if is_pyodide_context():
     import js
     from viur.scriptor._utils import _wait_for_result, bytes_to_blob
-else:
-    import prompt_toolkit
-    from prompt_toolkit.completion import PathCompleter, FuzzyCompleter
-    from ._validators import _FileDoesntExistsOrShouldBeReplacedValidator
 
 
 
@@ -26,6 +22,9 @@ if is_pyodide_context():
 
 else:
     async def _save_file_dialog(data, prompt):
+        import prompt_toolkit
+        from prompt_toolkit.completion import PathCompleter, FuzzyCompleter
+        from ._validators import _FileDoesntExistsOrShouldBeReplacedValidator
         validator = _FileDoesntExistsOrShouldBeReplacedValidator()
         filename = await prompt_toolkit.PromptSession().prompt_async(prompt,
                                                                      completer=FuzzyCompleter(PathCompleter()),
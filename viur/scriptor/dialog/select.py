@@ -4,8 +4,6 @@ if is_pyodide_context():
     import pyodide
     import js
     from viur.scriptor._utils import _wait_for_result
-else:
-    from simple_term_menu import TerminalMenu
 if is_pyodide_context():
     async def select(
         options: dict[str, str] | list[str] | tuple[str],
@@ -109,6 +107,7 @@ else:
         print(text)
         if image:
             print(f"In the Browser, an image would have been shown here: {image}")
+        from simple_term_menu import TerminalMenu
         terminal_menu = TerminalMenu(
             keys,
             multi_select=multiselect,
@@ -1,5 +1,5 @@
 from viur.scriptor._utils import is_pyodide_context
-import json
+from viur.scriptor import _codec
 if is_pyodide_context():
     import pyodide
     import js
@@ -28,7 +28,7 @@ if is_pyodide_context():
                             image=image)
         if select:
             res = await _wait_for_result()
-            res = json.loads(f"[{res}]")
+            res = _codec.loads(f"[{res}]")
             return res
 else:
     async def table(header: list[str], rows: list[list[str]], select: bool = None, multiselect: bool = None,
@@ -65,13 +65,13 @@ else:
             print('|'.join([' ' + c.ljust(column_widths[i] + 1) for i, c in enumerate(row)]))
         if multiselect:
             selection = await text("Your selections (comma-separated ints): ")
-            selection = json.loads(f"""[{selection}]""")
+            selection = _codec.loads(f"""[{selection}]""")
             assert isinstance(selection, list), "You need to input a json-list."
             assert all(isinstance(i, int) for i in selection), "All elements of the list must be ints."
             assert all(i < num_rows for i in selection), "You selected an invalid row."
             return selection
         else:
             selection = await text("Your selection: ")
-            selection = json.loads(selection)
+            selection = _codec.loads(selection)
             assert isinstance(selection, int)
             return selection
@@ -4,9 +4,6 @@ if is_pyodide_context():
     import pyodide
     import js
     from viur.scriptor._utils import _wait_for_result
-else:
-    import prompt_toolkit
-    from ._validators import _StringNotEmptyValidator
 
 if is_pyodide_context():
 
@@ -63,6 +60,8 @@ else:
             print(f"In the Browser, an image would have been shown here: {image}")
         if multiline:
             print("press [Esc] and then [Enter] to finish...")
+        import prompt_toolkit
+        from ._validators import _StringNotEmptyValidator
         return await prompt_toolkit.PromptSession().prompt_async(
             "Please enter text: " if prompt is None else prompt,
             placeholder=placeholder,
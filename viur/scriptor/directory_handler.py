@@ -5,19 +5,7 @@ if is_pyodide_context():
     import js
     from ._utils import bytes_to_blob, gather_async_iterator, _wait_for_result
 else:
-    import os
     import pathlib
-    import prompt_toolkit
-    from prompt_toolkit.completion import PathCompleter, FuzzyCompleter
-    from prompt_toolkit.validation import Validator, ValidationError
-
-
-    class DirectoryExistsOrShouldBeCreatedValidator(Validator):
-        def validate(self, document):
-            text = document.text
-            if not os.path.isdir(text) and not text.endswith('!'):
-                raise ValidationError(
-                    message="This directory is not valid. If you want to try to create it, add an exclamation-mark (!) at the end.")
 
 
 class WritableFileFromDirectoryHandler:
@@ -131,6 +119,9 @@ class DirectoryHandler:
 
             :return: a ``DirectoryHandler`` for the selected directory
             """
+            import prompt_toolkit
+            from prompt_toolkit.completion import PathCompleter, FuzzyCompleter
+            from .dialog._validators import DirectoryExistsOrShouldBeCreatedValidator
             dirname = await prompt_toolkit.PromptSession().prompt_async('Please enter a directory-name: ',
                                                                         completer=FuzzyCompleter(PathCompleter()),
                                                                         complete_while_typing=True,
@@ -314,6 +305,32 @@ class DirectoryHandler:
             with open(filepath, 'wb') as fout:
                 fout.write(data)
 
+    async def download_to_file(self, url: str, filename: str, may_already_exist: bool = False):
+        """
+        downloads a file from a URL into this directory, the download is written chunk by chunk, so it doesn't have
+        to fit into memory
+
+        :param url: the URL to download the file from (urls relative to the viur-backend are allowed)
+        :param filename: the name of the file the download should be written to
+        :param may_already_exist: if the file may already exist and should be replaced
+        :return: the number of bytes written, raises an ``HTTPException`` (without touching the file) if the download
+            failed
+        """
+        from . import modules
+        from .http_errors import get_exception_by_code, HTTPException
+        async with await modules.viur_request("GET", url, raw=True, stream=True) as response:
+            status_code = response.get_status_code()
+            if status_code < 200 or status_code >= 300:
+                errormessage = f"""Download of "{url}" returned with status-code {status_code}"""
+                if exception := get_exception_by_code(status_code):
+                    raise exception(errormessage, response)
+                raise HTTPException(status_code, "Http Error", errormessage, response)
+            f = await self.open_file_for_writing(filename=filename, may_already_exist=may_already_exist)
+            try:
+                return await response.write_to(f)
+            finally:
+                await f.close()
+
     if is_pyodide_context():
         async def read_from_file(self, filename: str, start: int = 0, end: int = None):
             """
@@ -325,12 +342,52 @@ class DirectoryHandler:
             :return: the content of the file (or a part thereof) as bytes
             """
             assert self._check_filename(filename), f"{filename} is not a valid filename"
+            gf = await self._get_file(filename)
+            if end is not None:
+                gf = gf.slice(start, end)
+            elif start != 0:
+                gf = gf.slice(start)
+            return (await gf.arrayBuffer()).to_bytes()
+
+        async def _get_file(self, filename: str):
             f = await self._directory_handle.getFileHandle(filename, create=False)
-            gf = await f.getFile()
-            gfab = await gf.arrayBuffer()
-            if start != 0 or end is not None:
-                return gfab.slice(start, end).to_bytes()
-            return gfab.to_bytes()
+            return await f.getFile()
+
+        async def get_file_size(self, filename: str) -> int:
+            """
+            returns the size of a file
+
+            :param filename: the name of the file
+            :return: the size of the file in bytes
+            """
+            assert self._check_filename(filename), f"{filename} is not a valid filename"
+            return (await self._get_file(filename)).size
+
+        async def iter_file_chunks(self, filename: str, chunk_size: int = 1024 * 1024, start: int = 0,
+                                   end: int = None):
+            """
+            reads a file piece by piece, so files larger than the memory can be processed
+
+            Only the requested chunk is read from the disk, the file isn't loaded as a whole.
+
+            .. code-block:: python
+
+                async for chunk in my_dir.iter_file_chunks("data.csv", chunk_size=4 * 1024 * 1024):
+                    process(chunk)
+
+            :param filename: the name of the file data should be read from
+            :param chunk_size: the maximum size of a chunk in bytes
+            :param start: the starting position in the file to read from
+            :param end: the end position in the file to read to
+            :return: an async iterator of ``bytes``
+            """
+            assert self._check_filename(filename), f"{filename} is not a valid filename"
+            assert chunk_size > 0, "chunk_size must be positive"
+            gf = await self._get_file(filename)
+            start, end, _ = slice(start, end).indices(gf.size)
+            for offset in range(start, end, chunk_size):
+                chunk = gf.slice(offset, min(offset + chunk_size, end))
+                yield (await chunk.arrayBuffer()).to_bytes()
     else:
         async def read_from_file(self, filename: str, start: int = 0, end: int = None):
             """
@@ -353,3 +410,39 @@ class DirectoryHandler:
                 fin.seek(start)
                 data = fin.read(end - start)
             return data
+
+        async def get_file_size(self, filename: str) -> int:
+            """
+            returns the size of a file
+
+            :param filename: the name of the file
+            :return: the size of the file in bytes
+            """
+            assert self._check_filename(filename), f"{filename} is not a valid filename"
+            return (self._directory_handle / filename).stat().st_size
+
+        async def iter_file_chunks(self, filename: str, chunk_size: int = 1024 * 1024, start: int = 0,
+                                   end: int = None):
+            """
+            reads a file piece by piece, so files larger than the memory can be processed
+
+            Only the requested chunk is read from the disk, the file isn't loaded as a whole.
+
+            .. code-block:: python
+
+                async for chunk in my_dir.iter_file_chunks("data.csv", chunk_size=4 * 1024 * 1024):
+                    process(chunk)
+
+            :param filename: the name of the file data should be read from
+            :param chunk_size: the maximum size of a chunk in bytes
+            :param start: the starting position in the file to read from
+            :param end: the end position in the file to read to
+            :return: an async iterator of ``bytes``
+            """
+            assert self._check_filename(filename), f"{filename} is not a valid filename"
+            assert chunk_size > 0, "chunk_size must be positive"
+            with open(self._directory_handle / filename, 'rb') as fin:
+                start, end, _ = slice(start, end).indices(fin.seek(0, 2))
+                fin.seek(start)
+                for offset in range(start, end, chunk_size):
+                    yield fin.read(min(chunk_size, end - offset))
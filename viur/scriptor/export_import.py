@@ -1,4 +1,3 @@
-import json
 from copy import deepcopy
 from itertools import chain
 from typing import Literal
@@ -6,6 +5,8 @@ from typing import Literal
 from .module_parts import TreeModule
 from .file import File
 from ._utils import flatten_dict
+from . import _codec
+from . import tracing
 from viur.scriptor import modules
 
 
@@ -114,7 +115,7 @@ def _format_for_table(data_from_db, structure):
         new = dict(flatten_dict(record))
 
         for raw_json_field in raw_json_fields:
-            new[raw_json_field] = json.dumps(original_record[raw_json_field])
+            new[raw_json_field] = _codec.dumps(original_record[raw_json_field])
         res.append(new)
     return res
 
@@ -603,7 +604,7 @@ def export_to_json(data, structure, filename="export.json"):
     :param filename: name of the resulting file (default: ``"export.json"``)
     :return: a ``File`` object containing the exported JSON data (pretty-printed, keys sorted)
     """
-    return File(json.dumps(_format_for_table(data, structure), indent=4, sort_keys=True).encode(), filename)
+    return File(_codec.dumps(_format_for_table(data, structure), indent=4, sort_keys=True).encode(), filename)
 
 async def export_module(name="",filename="export.json",csv_delimiter=","):
     """
@@ -780,40 +781,44 @@ async def import_from_table(
     table_iter = iter(table_as_dicts)
     first_item = next(table_iter)
     base_keys = _get_base_keys(first_item)
-    pre_extraction_strategy = _generate_pre_extraction_strategy(structure)
-    pre_extracted_data = []
-    for row in chain([first_item], table_iter):
-        prepared_data_for_preextraction = _prepare_for_preextraction(row, base_keys=base_keys)
-        pre_extracted_data_item = _pre_extract_with_strategy(prepared_data_for_preextraction,
-                                                             pre_extraction_strategy)
-        pre_extracted_data.append(pre_extracted_data_item)
-    extraction_strategy = _generate_extraction_strategy(structure, type(module).__name__)
-    extracted_data = _extract_with_strategy(pre_extracted_data, extraction_strategy)
-    data_prepared_for_db = [sum(d.values(), start=[]) for d in extracted_data]
+    with tracing.span("pre-extraction", "import") as trace_span:
+        pre_extraction_strategy = _generate_pre_extraction_strategy(structure)
+        pre_extracted_data = []
+        for row in chain([first_item], table_iter):
+            prepared_data_for_preextraction = _prepare_for_preextraction(row, base_keys=base_keys)
+            pre_extracted_data_item = _pre_extract_with_strategy(prepared_data_for_preextraction,
+                                                                 pre_extraction_strategy)
+            pre_extracted_data.append(pre_extracted_data_item)
+        trace_span.set(rows=len(pre_extracted_data))
+    with tracing.span("extraction", "import"):
+        extraction_strategy = _generate_extraction_strategy(structure, type(module).__name__)
+        extracted_data = _extract_with_strategy(pre_extracted_data, extraction_strategy)
+        data_prepared_for_db = [sum(d.values(), start=[]) for d in extracted_data]
     total_number_of_items = len(data_prepared_for_db)
     add_or_edit_function = {
         "edit": module.edit,
         "add_or_edit": module.add_or_edit,
         "add": module.add
     }[add_or_edit_mode]
-    for index, writable_entry in enumerate(data_prepared_for_db):
-        progress_callback(index=index, total=total_number_of_items)
-        edit_params = {
-            "params": writable_entry,
-            "renderer": "vi"
-        }
-        if tree_skel_type:
-            edit_params["skel_type"] = tree_skel_type
-
-        query_params_callback(edit_params)
-        if dry_run:
-            server_result_callback({"action": "dry_run"})
-        else:
-            res = {"action": "something unexpected went wrong"}
-            try:
-                res = await add_or_edit_function(**edit_params)
-            except Exception as e:
-                exception_callback(e, edit_params)
-                new_line = "\n"
-                res = {"action": f"""{type(e).__name__}: {new_line.join(e.args)}"""}
-            server_result_callback(res)
+    with tracing.span("write", "import", mode=add_or_edit_mode, records=total_number_of_items):
+        for index, writable_entry in enumerate(data_prepared_for_db):
+            progress_callback(index=index, total=total_number_of_items)
+            edit_params = {
+                "params": writable_entry,
+                "renderer": "vi"
+            }
+            if tree_skel_type:
+                edit_params["skel_type"] = tree_skel_type
+
+            query_params_callback(edit_params)
+            if dry_run:
+                server_result_callback({"action": "dry_run"})
+            else:
+                res = {"action": "something unexpected went wrong"}
+                try:
+                    res = await add_or_edit_function(**edit_params)
+                except Exception as e:
+                    exception_callback(e, edit_params)
+                    new_line = "\n"
+                    res = {"action": f"""{type(e).__name__}: {new_line.join(e.args)}"""}
+                server_result_callback(res)
@@ -0,0 +1,616 @@
+import base64
+import email.parser
+import email.policy
+import hashlib
+import itertools
+import json
+import random
+import secrets
+import threading
+import time
+from collections import Counter
+from http.cookies import SimpleCookie
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlsplit, parse_qsl
+
+SESSION_COOKIE = "viurCookie"
+_RESERVED_PARAMS = frozenset(("cursor", "limit", "orderby", "orderdir", "skey", "amount", "parententry", "node",
+                              "key", "parentNode", "search"))
+_SECURE_ACTIONS = frozenset(("edit", "add", "add_or_edit", "delete", "move", "preview", "getUploadURL", "logout"))
+
+
+def bone(type: str = "str", descr: str = None, multiple: bool = False, languages: list[str] = None, **props) -> dict:
+    """
+    returns the structure of a bone as the viur-backend sends it
+
+    :param type: the type of the bone, i.e. ``"str"``, ``"numeric"`` or ``"relational.tree.leaf.file"``
+    :param descr: the description of the bone
+    :param multiple: if true, the bone holds a list of values
+    :param languages: the languages of a translated bone
+    :param props: further properties, i.e. ``using`` for relational bones
+    """
+    return {
+        "type": type,
+        "descr": descr or "",
+        "multiple": multiple,
+        "languages": languages,
+        "required": False,
+        "readonly": False,
+        "visible": True,
+        "params": {},
+    } | props
+
+
+class FakeModule:
+    """
+    The in-memory data of one module of a ``FakeBackend``.
+
+    :param name: the name of the module
+    :param handler: ``"list"``, ``"tree"`` or ``"singleton"`` (or a more specific handler like ``"tree.file"``)
+    :param structure: maps bone-names to bone-structures (see ``bone``), ``{"name": bone()}`` if omitted
+    """
+
+    def __init__(self, name: str, handler: str = "list", structure: dict = None):
+        self.name = name
+        self.handler = handler
+        self.structure = structure if structure is not None else {"name": bone(descr="Name")}
+        self.records = {}
+        self._key_counter = itertools.count(1)
+
+    def __repr__(self):
+        return f"""<{self.__class__.__name__} "{self.name}", records={len(self.records)}>"""
+
+    @property
+    def is_tree(self) -> bool:
+        return self.handler.startswith(("tree", "hierarchy"))
+
+    def new_key(self) -> str:
+        return f"""{self.name}-{next(self._key_counter):08d}"""
+
+    def add(self, values: dict = None, key: str = None, skel_type: str = None, parententry: str = None) -> dict:
+        """
+        adds a record
+
+        :param values: the values of the bones
+        :param key: the key of the record, a new one is generated if omitted
+        :param skel_type: (tree-modules only) ``"node"`` or ``"leaf"``
+        :param parententry: (tree-modules only) the key of the parent-node, ``None`` for root-nodes
+        :return: the new record
+        """
+        record = {bone_name: None for bone_name in self.structure}
+        record.update(values or {})
+        record["key"] = key or self.new_key()
+        if self.is_tree:
+            record["skel_type"] = skel_type or "leaf"
+            record["parententry"] = parententry
+        self.records[record["key"]] = record
+        return record
+
+    def get_children(self, key: str) -> list[dict]:
+        return [record for record in self.records.values() if record.get("parententry") == key]
+
+    def delete(self, key: str):
+        for child in self.get_children(key):
+            self.delete(child["key"])
+        self.records.pop(key, None)
+
+    def query(self, params: dict, skel_type: str = None) -> list[dict]:
+        records = self.records.values()
+        if self.is_tree:
+            records = [record for record in records if record["skel_type"] == (skel_type or "leaf")]
+            if "parententry" in params:
+                records = [record for record in records if record["parententry"] == params["parententry"]]
+        for name, value in params.items():
+            if name in _RESERVED_PARAMS:
+                continue
+            bone_name, _, operator = name.partition("$")
+            records = [record for record in records if _matches(record.get(bone_name), operator, value)]
+        order_by = params.get("orderby", "key")
+        return sorted(records, key=lambda record: _sort_key(record.get(order_by)),
+                      reverse=params.get("orderdir") in ("1", "desc"))
+
+
+def _coerce(value, like):
+    if isinstance(like, bool):
+        return value in ("1", "true", "True")
+    if isinstance(like, (int, float)):
+        try:
+            return type(like)(value)
+        except ValueError:
+            return value
+    return value
+
+
+def _matches(record_value, operator: str, value: str) -> bool:
+    if record_value is None:
+        return False
+    value = _coerce(value, record_value)
+    try:
+        match operator:
+            case "":
+                return record_value == value or (isinstance(record_value, list) and value in record_value)
+            case "lt":
+                return record_value < value
+            case "gt":
+                return record_value > value
+            case "le":
+                return record_value <= value
+            case "ge":
+                return record_value >= value
+            case "lk":
+                return str(record_value).startswith(str(value))
+    except TypeError:
+        return False
+    return False
+
+
+def _sort_key(value):
+    # None sorts first, values of different types are ordered by their type-name
+    return (value is not None, type(value).__name__, value if value is not None else 0)
+
+
+def _encode_cursor(offset: int) -> str:
+    return base64.urlsafe_b64encode(f"""offset:{offset}""".encode()).decode("ascii")
+
+
+def _decode_cursor(cursor: str) -> int:
+    try:
+        return int(base64.urlsafe_b64decode(cursor.encode("ascii")).decode().split(":", 1)[1])
+    except (ValueError, IndexError):
+        return 0
+
+
+class FakeBackend:
+    """
+    A stand-in for a viur-backend that runs in a background-thread on localhost, intended for benchmarks and offline
+    tests of ``Modules``, ``ListModule`` and ``TreeModule`` (native Python only).
+
+    The data is kept in memory. The backend implements security-keys (every key can be used once, an invalid key is
+    answered with status-code 412), the login, ``/vi/config``, and ``list`` (with cursors and filters like
+    ``name$gt``), ``view``, ``structure``, ``edit``, ``add``, ``add_or_edit``, ``delete``, ``preview``,
+    ``listRootNodes`` and ``move`` of all modules. Uploads through ``File.upload`` are stored in the ``file``-module.
+    Responses of ``GET``-requests have an ``ETag``-header and are answered with 304 if the ``If-None-Match``-header
+    matches.
+
+    .. code-block:: python
+
+        with FakeBackend(latency=0.05, page_size=50) as backend:
+            backend.add_module("person", structure={"name": bone(), "age": bone("numeric")})
+            backend.populate("person", 1000, lambda i: {"name": f"person {i}", "age": i % 90})
+            await _init_modules(base_url=backend.base_url, username="test", password="test")
+
+    :param latency: the delay of every response in seconds
+    :param latency_jitter: a random delay of up to this many seconds added to ``latency``
+    :param error_rate: the fraction of requests (between 0 and 1) that fail with ``error_status``, requests without
+        a session (i.e. the login) never fail
+    :param error_status: the status-code of the injected errors
+    :param page_size: the number of records per ``list``-page, unless the request has a ``limit``
+    :param max_page_size: the maximum number of records per ``list``-page
+    :param username: the username accepted by the login
+    :param password: the password accepted by the login
+    :param require_login: if true, all requests except the login and security-keys need a session-cookie
+    :param host: the interface the server listens on
+    :param port: the port the server listens on, a free port is chosen if ``0``
+    :param seed: the seed for the random latencies and errors, to make runs reproducible
+    """
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        latency_jitter: float = 0.0,
+        error_rate: float = 0.0,
+        error_status: int = 503,
+        page_size: int = 30,
+        max_page_size: int = 100,
+        username: str = "test",
+        password: str = "test",
+        require_login: bool = True,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        seed: int = None,
+    ):
+        self.latency = latency
+        self.latency_jitter = latency_jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.page_size = page_size
+        self.max_page_size = max_page_size
+        self.username = username
+        self.password = password
+        self.require_login = require_login
+        self.modules = {}
+        self.requests = Counter()
+        self.uploads = {}
+        self._host = host
+        self._port = port
+        self._random = random.Random(seed)
+        self._skeys = set()
+        self._sessions = set()
+        self._lock = threading.RLock()
+        self._server = None
+        self._thread = None
+        self.add_module("user", structure={"name": bone(descr="Name"), "access": bone(multiple=True)})
+        self.modules["user"].add({"name": username, "access": ["root"]}, key="user-self")
+        file_module = self.add_module("file", handler="tree.file",
+                                      structure={"name": bone(), "size": bone("numeric"), "mimetype": bone(),
+                                                 "dlkey": bone()})
+        file_module.add({"name": "root"}, skel_type="node")
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+    def __repr__(self):
+        return f"""<{self.__class__.__name__} {self.base_url if self._server else "stopped"}>"""
+
+    @property
+    def base_url(self) -> str:
+        """
+        the url to pass as ``base_url`` to ``Modules``
+        """
+        host, port = self._server.server_address[:2]
+        return f"""http://{host}:{port}"""
+
+    def start(self) -> str:
+        """
+        starts the server in a background-thread
+
+        :return: the base-url of the server
+        """
+        backend = self
+
+        class Handler(_FakeRequestHandler):
+            pass
+
+        Handler.backend = backend
+        self._server = ThreadingHTTPServer((self._host, self._port), Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, name="fake-viur-backend", daemon=True)
+        self._thread.start()
+        return self.base_url
+
+    def stop(self):
+        """
+        stops the server
+        """
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def add_module(self, name: str, handler: str = "list", structure: dict = None) -> FakeModule:
+        """
+        adds a module
+
+        :param name: the name of the module
+        :param handler: ``"list"``, ``"tree"`` or ``"singleton"``
+        :param structure: maps bone-names to bone-structures (see ``bone``)
+        :return: the ``FakeModule``, to add records directly
+        """
+        module = self.modules[name] = FakeModule(name, handler, structure)
+        return module
+
+    def populate(self, name: str, amount: int, factory=None, skel_type: str = None, parententry: str = None):
+        """
+        adds many records to a module
+
+        :param name: the name of the module
+        :param amount: the number of records
+        :param factory: called with the index of the record, returns the values of the record
+        :param skel_type: (tree-modules only) ``"node"`` or ``"leaf"``
+        :param parententry: (tree-modules only) the key of the parent-node
+        """
+        module = self.modules[name]
+        for index in range(amount):
+            values = factory(index) if factory else {"name": f"""{name} {index}"""}
+            module.add(values, skel_type=skel_type, parententry=parententry)
+
+    def reset_stats(self):
+        """
+        resets the request-counters in ``requests``
+        """
+        self.requests.clear()
+
+    def issue_skey(self) -> str:
+        with self._lock:
+            skey = secrets.token_urlsafe(16)
+            self._skeys.add(skey)
+            return skey
+
+    def consume_skey(self, skey: str | None) -> bool:
+        with self._lock:
+            if isinstance(skey, str) and skey in self._skeys:
+                self._skeys.remove(skey)
+                return True
+            return False
+
+    def delay(self):
+        latency = self.latency
+        if self.latency_jitter:
+            with self._lock:
+                latency += self._random.uniform(0, self.latency_jitter)
+        if latency > 0:
+            time.sleep(latency)
+
+    def should_fail(self) -> bool:
+        if not self.error_rate:
+            return False
+        with self._lock:
+            return self._random.random() < self.error_rate
+
+
+class _FakeRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    backend: FakeBackend = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        self._dispatch("GET")
+
+    def do_POST(self):
+        self._dispatch("POST")
+
+    def do_PUT(self):
+        self._dispatch("PUT")
+
+    def do_DELETE(self):
+        self._dispatch("DELETE")
+
+    def _dispatch(self, method: str):
+        try:
+            self._handle(method)
+        except Exception as e:
+            self._send_error(500, "Internal Server Error", f"""{type(e).__name__}: {e}""")
+
+    def _handle(self, method: str):
+        backend = self.backend
+        url = urlsplit(self.path)
+        params = dict(parse_qsl(url.query, keep_blank_values=True))
+        body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        parts = [part for part in url.path.split("/") if part]
+        backend.requests[f"""{method} {"/".join(parts[:3])}"""] += 1
+        backend.delay()
+        # requests before the login never fail, the login itself isn't retried by the client
+        if (self._has_session() or not backend.require_login) and backend.should_fail():
+            return self._send_json({"reason": "Injected error", "descr": "error injected by FakeBackend"},
+                                   status=backend.error_status)
+        if parts and parts[0] == "_upload":
+            return self._handle_upload(method, parts[1], body)
+        if method == "POST":
+            params.update(self._parse_body(body))
+        if len(parts) < 2 or parts[0] not in ("json", "vi"):
+            return self._send_error(404, "Not Found")
+        renderer, module_name, action, args = parts[0], parts[1], (parts[2:3] or [""])[0], parts[3:]
+        with backend._lock:
+            if module_name == "skey":
+                return self._handle_skey(params)
+            if module_name == "config" and renderer == "vi":
+                return self._handle_config()
+            if module_name == "user" and action in ("auth_userpassword", "logout"):
+                return self._handle_session(action, params)
+            if backend.require_login and not self._has_session():
+                return self._send_error(401, "Unauthorized")
+            module = backend.modules.get(module_name)
+            if module is None:
+                return self._send_error(404, "Not Found")
+            if action in _SECURE_ACTIONS:
+                if method != "POST":
+                    return self._send_error(405, "Method Not Allowed")
+                if not backend.consume_skey(params.pop("skey", None)):
+                    return self._send_error(412, "Precondition Failed", "Invalid security-key")
+            handler = getattr(self, f"""_action_{action}""", None)
+            if handler is None:
+                return self._send_error(404, "Not Found")
+            return handler(module, args, params)
+
+    # --- helpers ---
+
+    def _parse_body(self, body: bytes) -> dict:
+        content_type = self.headers.get("Content-Type", "")
+        if content_type.startswith("multipart/form-data"):
+            message = email.parser.BytesParser(policy=email.policy.HTTP).parsebytes(
+                f"""Content-Type: {content_type}\r\n\r\n""".encode() + body
+            )
+            params = {}
+            for part in message.iter_parts():
+                name = part.get_param("name", header="content-disposition")
+                payload = part.get_payload(decode=True)
+                value = payload if part.get_filename() else payload.decode("utf-8")
+                self._add_param(params, name, value)
+            return params
+        params = {}
+        for name, value in parse_qsl(body.decode("utf-8"), keep_blank_values=True):
+            self._add_param(params, name, value)
+        return params
+
+    @staticmethod
+    def _add_param(params: dict, name: str, value):
+        if name in params:
+            if not isinstance(params[name], list):
+                params[name] = [params[name]]
+            params[name].append(value)
+        else:
+            params[name] = value
+
+    def _has_session(self) -> bool:
+        cookie = SimpleCookie(self.headers.get("Cookie", ""))
+        return SESSION_COOKIE in cookie and cookie[SESSION_COOKIE].value in self.backend._sessions
+
+    def _send_json(self, data, status: int = 200, headers: dict = None):
+        body = json.dumps(data).encode("utf-8")
+        if self.command == "GET" and status == 200:
+            etag = f'''"{hashlib.sha1(body).hexdigest()}"'''
+            headers = (headers or {}) | {"ETag": etag}
+            if self.headers.get("If-None-Match") == etag:
+                status, body = 304, b""
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_error(self, status: int, reason: str, descr: str = ""):
+        self._send_json({"reason": reason, "descr": descr or reason}, status=status)
+
+    @staticmethod
+    def _split_args(module: FakeModule, args: list[str]) -> tuple[str | None, list[str]]:
+        if module.is_tree and args and args[0] in ("node", "leaf"):
+            return args[0], args[1:]
+        return None, args
+
+    def _get_record(self, module: FakeModule, args: list[str], params: dict):
+        skel_type, args = self._split_args(module, args)
+        key = args[-1] if args else params.get("key")
+        if module.handler.startswith("singleton"):
+            key = key or module.name
+        return skel_type, key, module.records.get(key)
+
+    @staticmethod
+    def _clean_values(module: FakeModule, params: dict) -> dict:
+        return {name: value for name, value in params.items() if name in module.structure}
+
+    # --- session ---
+
+    def _handle_skey(self, params: dict):
+        amount = int(params.get("amount") or 1)
+        if amount > 1:
+            return self._send_json([self.backend.issue_skey() for _ in range(min(amount, 100))])
+        return self._send_json(self.backend.issue_skey())
+
+    def _handle_config(self):
+        return self._send_json({
+            "modules": {
+                name: {"name": name, "handler": module.handler, "functions": {}}
+                for name, module in self.backend.modules.items()
+            },
+        })
+
+    def _handle_session(self, action: str, params: dict):
+        backend = self.backend
+        if not backend.consume_skey(params.get("skey")):
+            return self._send_error(412, "Precondition Failed", "Invalid security-key")
+        if action == "logout":
+            cookie = SimpleCookie(self.headers.get("Cookie", ""))
+            if SESSION_COOKIE in cookie:
+                backend._sessions.discard(cookie[SESSION_COOKIE].value)
+            return self._send_json("OKAY")
+        if params.get("name") != backend.username or params.get("password") != backend.password:
+            return self._send_json("FAILURE")
+        session = secrets.token_urlsafe(24)
+        backend._sessions.add(session)
+        return self._send_json("OKAY", headers={"Set-Cookie": f"""{SESSION_COOKIE}={session}; Path=/; HttpOnly"""})
+
+    # --- actions ---
+
+    def _action_structure(self, module: FakeModule, args: list[str], params: dict):
+        return self._send_json({"action": "structure", "structure": module.structure})
+
+    def _action_list(self, module: FakeModule, args: list[str], params: dict):
+        skel_type, _ = self._split_args(module, args)
+        records = module.query(params, skel_type)
+        offset = _decode_cursor(params["cursor"]) if params.get("cursor") else 0
+        page_size = self.backend.page_size
+        if params.get("limit"):
+            page_size = min(int(params["limit"]), self.backend.max_page_size)
+        page = records[offset:offset + page_size]
+        cursor = _encode_cursor(offset + page_size) if offset + page_size < len(records) else None
+        return self._send_json({"action": "list", "skellist": page, "cursor": cursor, "structure": module.structure})
+
+    def _action_view(self, module: FakeModule, args: list[str], params: dict):
+        if module.name == "user" and args == ["self"]:
+            args = ["user-self"]
+        _, _, record = self._get_record(module, args, params)
+        if record is None:
+            return self._send_error(404, "Not Found")
+        return self._send_json({"action": "view", "values": record, "structure": module.structure})
+
+    def _action_edit(self, module: FakeModule, args: list[str], params: dict):
+        _, _, record = self._get_record(module, args, params)
+        if record is None:
+            return self._send_error(404, "Not Found")
+        values = self._clean_values(module, params)
+        if not values:
+            return self._send_json({"action": "edit", "values": record, "structure": module.structure})
+        record.update(values)
+        return self._send_json({"action": "editSuccess", "values": record, "structure": module.structure})
+
+    def _action_add(self, module: FakeModule, args: list[str], params: dict):
+        skel_type, _ = self._split_args(module, args)
+        if module.name == "file" and params.get("key") in self.backend.uploads:
+            upload = self.backend.uploads.pop(params["key"])
+            record = module.add(upload["values"], key=params["key"], skel_type="leaf", parententry=upload["node"])
+            return self._send_json({"action": "addSuccess", "values": record, "structure": module.structure})
+        values = self._clean_values(module, params)
+        if not values:
+            return self._send_json({"action": "add", "values": None, "structure": module.structure})
+        record = module.add(values, skel_type=skel_type, parententry=params.get("node"))
+        return self._send_json({"action": "addSuccess", "values": record, "structure": module.structure})
+
+    def _action_add_or_edit(self, module: FakeModule, args: list[str], params: dict):
+        skel_type, key, record = self._get_record(module, args, params)
+        values = self._clean_values(module, params)
+        if record is not None:
+            record.update(values)
+            return self._send_json({"action": "editSuccess", "values": record, "structure": module.structure})
+        record = module.add(values, key=key, skel_type=skel_type, parententry=params.get("node"))
+        return self._send_json({"action": "addSuccess", "values": record, "structure": module.structure})
+
+    def _action_preview(self, module: FakeModule, args: list[str], params: dict):
+        return self._send_json({"action": "preview", "values": self._clean_values(module, params),
+                                "structure": module.structure})
+
+    def _action_delete(self, module: FakeModule, args: list[str], params: dict):
+        _, key, record = self._get_record(module, args, params)
+        if record is None:
+            return self._send_error(404, "Not Found")
+        module.delete(key)
+        return self._send_json("OKAY")
+
+    def _action_listRootNodes(self, module: FakeModule, args: list[str], params: dict):
+        return self._send_json([
+            {"key": record["key"], "name": record.get("name")}
+            for record in module.records.values()
+            if record.get("skel_type") == "node" and record.get("parententry") is None
+        ])
+
+    def _action_move(self, module: FakeModule, args: list[str], params: dict):
+        record = module.records.get(params.get("key"))
+        parent = module.records.get(params.get("parentNode"))
+        if record is None or parent is None:
+            return self._send_error(404, "Not Found")
+        record["parententry"] = parent["key"]
+        return self._send_json({"action": "moveSuccess", "values": record})
+
+    def _action_getUploadURL(self, module: FakeModule, args: list[str], params: dict):
+        key = module.new_key()
+        node = params.get("node")
+        if node is None:
+            roots = [record for record in module.records.values() if record.get("parententry") is None]
+            node = roots[0]["key"] if roots else None
+        self.backend.uploads[key] = {
+            "node": node,
+            "data": None,
+            "values": {"name": params.get("fileName"), "mimetype": params.get("mimeType"),
+                       "size": int(params.get("size") or 0), "dlkey": key},
+        }
+        return self._send_json({"action": "getUploadURL", "values": {
+            "uploadUrl": f"""{self.backend.base_url}/_upload/{key}""",
+            "uploadKey": key,
+        }})
+
+    def _handle_upload(self, method: str, key: str, body: bytes):
+        with self.backend._lock:
+            upload = self.backend.uploads.get(key)
+            if method != "PUT" or upload is None:
+                return self._send_error(404, "Not Found")
+            upload["data"] = body
+        self.send_response(200)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
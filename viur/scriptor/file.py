@@ -1,11 +1,8 @@
-import json
-import chardet
-import magic
-from openpyxl.reader.excel import ExcelReader
 from io import BytesIO, StringIO
 import csv
 from ._utils import list_table_to_dict_table, normalize_table, list_to_excel, list_to_csv, save_file
 from .dialog import Dialog
+from . import _codec
 
 
 class File:
@@ -142,9 +139,10 @@ class File:
 
         :return: python-object represented by the JSON-file
         """
-        return json.loads(self._data)
+        return _codec.loads(self._data)
 
     def _xls_data_to_list_table(self):
+        from openpyxl.reader.excel import ExcelReader
         bio = BytesIO(self._data)
         xls_reader = ExcelReader(bio, data_only=True)
         xls_reader.read()
@@ -200,6 +198,7 @@ class File:
 
         :return: mime-type of the file
         """
+        import magic
         detected = magic.detect_from_content(self._data)
         return detected.mime_type
 
@@ -209,6 +208,7 @@ class File:
 
         :return: ``dict`` with the most probable encoding's name, probability and language if available
         """
+        import chardet
         return chardet.detect(self._data)
 
     def get_all_text_encoding_guesses(self):
@@ -217,6 +217,7 @@ class File:
 
         :return: ``list`` of ``dict``\\ s with the most probable encodings and their name, probability and language if available
         """
+        import chardet
         return chardet.detect_all(self._data)
 
     async def save_dialog(self, prompt: str = "Please select a file to save to:"):
@@ -259,8 +260,8 @@ class File:
         if is_pyodide_context():
             import js
             from pyodide.ffi import to_js
-            js_array = to_js(self._data)
-            blob = js.Blob.new([js_array], to_js({"type": mime_type}))
+            from ._utils import bytes_to_blob
+            blob = bytes_to_blob(self._data, mime_type)
             await js.fetch(upload_url, **{
                 "method": "POST",
                 "body": blob,
@@ -268,8 +269,10 @@ class File:
                 "mode": "no-cors",
             })
         else:
-            import requests as _requests
-            _requests.put(upload_url, data=self._data, headers={"Content-Type": mime_type})
+            from . import modules
+            from .requests import WebRequest
+            await WebRequest.request("PUT", upload_url, data=self._data, headers={"Content-Type": mime_type},
+                                     session=modules.get_session(), executor=modules.get_executor())
 
     async def upload(self, node: str = None, return_full_skel: bool = False) -> str | dict:
         """
@@ -0,0 +1,181 @@
+import time
+
+LATENCY_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000)
+
+
+class RequestInfo:
+    """
+    Describes one call of ``Modules.viur_request``, it's passed to the request-hooks.
+
+    The attributes ``status``, ``duration``, ``bytes_in``, ``bytes_out``, ``attempts``, ``from_cache``, ``shared``
+    and ``error`` are filled in while the request runs, they are complete when the after-hooks are called.
+
+    :param method: the HTTP-method (or ``"SECURE_POST"``)
+    :param url: the full url of the request
+    :param module: the name of the module, ``None`` for absolute urls
+    :param action: the action of the module, i.e. ``"list"`` or ``"edit"``
+    """
+
+    def __init__(self, method: str, url: str, module: str | None, action: str | None):
+        self.method = method
+        self.url = url
+        self.module = module
+        self.action = action
+        self.status = None
+        self.started_at = time.perf_counter()
+        self.duration = None
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.attempts = 0
+        self.from_cache = False
+        self.shared = False
+        self.error = None
+
+    def __repr__(self):
+        return f"""<{self.__class__.__name__} {self.method} "{self.url}", status={self.status}>"""
+
+    @property
+    def retries(self) -> int:
+        """
+        the number of attempts after the first one
+        """
+        return max(0, self.attempts - 1)
+
+    def finish(self, error: Exception = None):
+        self.duration = time.perf_counter() - self.started_at
+        self.error = error
+
+
+class LatencyHistogram:
+    """
+    Counts durations in fixed buckets (see ``LATENCY_BUCKETS_MS``).
+    """
+
+    def __init__(self):
+        self.counts = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def add(self, duration_ms: float):
+        index = 0
+        while index < len(LATENCY_BUCKETS_MS) and duration_ms > LATENCY_BUCKETS_MS[index]:
+            index += 1
+        self.counts[index] += 1
+        self.count += 1
+        self.total_ms += duration_ms
+        self.max_ms = max(self.max_ms, duration_ms)
+
+    def percentile(self, fraction: float) -> float | None:
+        """
+        returns the upper bound of the bucket that contains the given fraction of all durations
+
+        :param fraction: a number between 0 and 1, i.e. ``0.95``
+        """
+        if not self.count:
+            return None
+        threshold = fraction * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= threshold:
+                return LATENCY_BUCKETS_MS[index] if index < len(LATENCY_BUCKETS_MS) else self.max_ms
+        return self.max_ms
+
+    def to_dict(self) -> dict:
+        labels = [f"""<={bound}""" for bound in LATENCY_BUCKETS_MS] + [f""">{LATENCY_BUCKETS_MS[-1]}"""]
+        return dict(zip(labels, self.counts))
+
+
+class _EndpointStats:
+    def __init__(self):
+        self.latency = LatencyHistogram()
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.retries = 0
+        self.cache_hits = 0
+
+
+class RequestMetrics:
+    """
+    Collects counters and latencies of all requests sent through ``Modules.viur_request``.
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        """
+        drops all collected values
+        """
+        self._endpoints = {}
+        self.requests = 0
+        self.errors = 0
+        self.skey_fetches = 0
+        self.skeys_fetched = 0
+        self.started_at = time.time()
+
+    def record(self, info: RequestInfo):
+        """
+        adds a finished request
+
+        :param info: the ``RequestInfo`` of the request
+        """
+        key = (info.module, info.action, info.status if info.status is not None else "error")
+        endpoint = self._endpoints.get(key)
+        if endpoint is None:
+            endpoint = self._endpoints[key] = _EndpointStats()
+        endpoint.latency.add(info.duration * 1000)
+        endpoint.bytes_in += info.bytes_in
+        endpoint.bytes_out += info.bytes_out
+        endpoint.retries += info.retries
+        endpoint.cache_hits += info.from_cache
+        self.requests += 1
+        if info.error is not None:
+            self.errors += 1
+
+    def record_skey_fetch(self, amount: int):
+        """
+        counts a request for security-keys
+
+        :param amount: the number of security-keys requested
+        """
+        self.skey_fetches += 1
+        self.skeys_fetched += amount
+
+    def snapshot(self) -> dict:
+        """
+        returns all collected values as ``dict``, see ``Modules.stats``
+        """
+        endpoints = []
+        for (module, action, status), endpoint in sorted(self._endpoints.items(), key=lambda item: str(item[0])):
+            latency = endpoint.latency
+            endpoints.append({
+                "module": module,
+                "action": action,
+                "status": status,
+                "count": latency.count,
+                "total_ms": round(latency.total_ms, 3),
+                "mean_ms": round(latency.total_ms / latency.count, 3),
+                "p50_ms": latency.percentile(0.5),
+                "p95_ms": latency.percentile(0.95),
+                "max_ms": round(latency.max_ms, 3),
+                "bytes_in": endpoint.bytes_in,
+                "bytes_out": endpoint.bytes_out,
+                "retries": endpoint.retries,
+                "cache_hits": endpoint.cache_hits,
+                "histogram": latency.to_dict(),
+            })
+        return {
+            "since": self.started_at,
+            "requests": self.requests,
+            "errors": self.errors,
+            "retries": sum(endpoint.retries for endpoint in self._endpoints.values()),
+            "cache_hits": sum(endpoint.cache_hits for endpoint in self._endpoints.values()),
+            "total_ms": round(sum(endpoint.latency.total_ms for endpoint in self._endpoints.values()), 3),
+            "bytes_in": sum(endpoint.bytes_in for endpoint in self._endpoints.values()),
+            "bytes_out": sum(endpoint.bytes_out for endpoint in self._endpoints.values()),
+            "skey_fetches": self.skey_fetches,
+            "skeys_fetched": self.skeys_fetched,
+            "endpoints": endpoints,
+        }
@@ -1,41 +1,125 @@
+import asyncio
+import copy
+import functools
+import inspect
+import time
 import traceback
-import requests
+from http.cookies import SimpleCookie
+from concurrent.futures import ThreadPoolExecutor
 from urllib.parse import urlencode as _urlencode
-from .module_parts import BaseModule, ListModule, TreeModule, SingletonModule, Method
+from .module_parts import BaseModule, ListModule, TreeModule, SingletonModule
 from .http_errors import get_exception_by_code, HTTPException
 from ._utils import join_url
 from .requests import WebRequest
-from ._utils import is_pyodide_context, flatten_dict
+from ._utils import is_pyodide_context
 from .dialog import Dialog
-import json
+from ._skey import SkeyPool
+from ._scheduler import RequestScheduler
+from .retry import RetryPolicy
+from .cache import ResponseCache, CacheEntry
+from .metrics import RequestMetrics, RequestInfo
+from . import tracing
+from ._body import encode_body, estimate_body_size
+from ._session_cache import SessionCache
+from ._config_cache import ConfigCache
+from . import _codec
 
 if is_pyodide_context():
-    from js import FormData
     from pyodide.ffi import JsProxy
-else:
-    from urllib3 import encode_multipart_formdata
 
 
 class Modules:
     """
     used to retrieve modules from the viur-backend
+
+    In the native Python context all requests are sent through one shared ``requests``-session, so connections to
+    the backend are pooled and kept alive between requests. In the browser, connection handling is left to the browser
+    and the pool-parameters are ignored.
+
+    :param base_url: the url of the viur server
+    :param username: the username used to log in (native Python context only)
+    :param password: the password used to log in (native Python context only)
+    :param login_skey: an optional key sent as ``X-Scriptor``-header on login
+    :param cookies: cookies of an existing session, if set the login is skipped
+    :param pool_connections: the number of hosts for which a connection-pool is kept
+    :param pool_maxsize: the maximum number of connections kept open per host, this is also the number of native
+        requests that can run concurrently
+    :param keep_alive: if false, every connection is closed after its request
+    :param skey_pool_size: the maximum number of security-keys fetched in advance for ``SECURE_POST``-requests, the
+        pool starts with one key and grows while many ``SECURE_POST``-requests are sent
+    :param max_concurrency: the maximum number of requests in flight, either for all requests or as ``dict`` per
+        HTTP-method (see ``set_request_limits``)
+    :param rate_limit: the maximum number of requests per second, either for all requests or as ``dict`` per
+        HTTP-method (see ``set_request_limits``)
+    :param retry_policy: the ``RetryPolicy`` for failed requests, ``None`` disables retrying
+    :param response_cache: a ``ResponseCache`` for ``GET``-requests, no responses are cached if omitted
+    :param single_flight: if true, concurrent identical ``GET``-requests share one request and one result
+    :param session_cache: (native Python only) if set, the session-cookies are kept on disk and reused by the next
+        ``init`` with the same base-url and username, so the login is skipped while the session is valid. Either
+        ``True`` for the default directory, a directory or a ``SessionCache``
+    :param config_cache: if set, the module-catalogue of the backend is kept between runs (on disk or in the
+        storage of the browser) and only revalidated after an hour. Either ``True``, a directory (native Python only)
+        or a ``ConfigCache``
     """
 
+    _handler_classes = {
+        "tree": TreeModule,
+        "hierarchy": TreeModule,
+        "list": ListModule,
+        "singleton": SingletonModule,
+    }
+
     def __init__(
         self,
         base_url: str,
         username: str = None,
         password: str = None,
         login_skey: str = None,
-        cookies: str = None
+        cookies: str = None,
+        pool_connections: int = 10,
+        pool_maxsize: int = 10,
+        keep_alive: bool = True,
+        skey_pool_size: int = 10,
+        max_concurrency: int | dict[str, int] = None,
+        rate_limit: float | dict[str, float] = None,
+        retry_policy: RetryPolicy | None = RetryPolicy(),
+        response_cache: ResponseCache | None = None,
+        single_flight: bool = True,
+        session_cache: bool | str | SessionCache = False,
+        config_cache: bool | str | ConfigCache = False,
     ):
         self._base_url = base_url
         self._username = username
         self._password = password
         self._login_skey = login_skey
         self._session = None
+        self._executor = None
         self._cookies = cookies
         self._modules = None
+        self._pool_connections = pool_connections
+        self._pool_maxsize = pool_maxsize
+        self._keep_alive = keep_alive
+        self._skey_pool = SkeyPool(self._fetch_skeys, size=skey_pool_size)
+        self._scheduler = RequestScheduler(max_concurrency=max_concurrency, rate_limit=rate_limit)
+        self._retry_policy = retry_policy
+        self._response_cache = response_cache
+        self._single_flight = single_flight
+        self._inflight = {}
+        self._metrics = RequestMetrics()
+        self._before_request_hooks = []
+        self._after_request_hooks = []
+        if session_cache is True:
+            session_cache = SessionCache()
+        elif session_cache and not isinstance(session_cache, SessionCache):
+            session_cache = SessionCache(session_cache)
+        self._session_cache = session_cache or None
+        if config_cache is True:
+            config_cache = ConfigCache()
+        elif config_cache and not isinstance(config_cache, ConfigCache):
+            config_cache = ConfigCache(config_cache)
+        self._config_cache = config_cache or None
+        self._config_from_cache = False
+        self._module_classes = {}
 
     def is_logged_in(self):
         """
@@ -45,6 +129,124 @@ class Modules:
         """
         return self._session is not None and self._cookies is not None
 
+    def get_session(self):
+        """
+        returns the ``requests``-session all native requests are sent through (``None`` in the browser or before
+        ``init`` was called)
+
+        :return: the shared ``requests.Session``
+        """
+        return self._session
+
+    def get_executor(self):
+        """
+        returns the thread pool the native requests are run in (``None`` in the browser or before ``init`` was called)
+
+        :return: the shared ``ThreadPoolExecutor``
+        """
+        return self._executor
+
+    def set_request_limits(self, max_concurrency: int | dict[str, int] = None,
+                           rate_limit: float | dict[str, float] = None):
+        """
+        limits the number of requests in flight and the number of requests per second, replaces the previous limits
+
+        Both limits can be a single number for all requests or a ``dict`` mapping HTTP-methods to limits, i.e.
+        ``{"*": 10, "SECURE_POST": 2}``. The limit for ``"*"`` applies to all requests, the limit of a method applies
+        in addition to it. ``"SECURE_POST"`` falls back to the limit for ``"POST"``.
+
+        :param max_concurrency: the maximum number of requests in flight, ``None`` for no limit
+        :param rate_limit: the maximum number of requests per second, ``None`` for no limit
+        """
+        self._scheduler = RequestScheduler(max_concurrency=max_concurrency, rate_limit=rate_limit)
+
+    def set_retry_policy(self, retry_policy: RetryPolicy | None):
+        """
+        sets the policy that decides if and when failed requests are repeated
+
+        :param retry_policy: the ``RetryPolicy`` to use, ``None`` disables retrying
+        """
+        self._retry_policy = retry_policy
+
+    def set_response_cache(self, response_cache: ResponseCache | None):
+        """
+        sets the cache for the responses of ``GET``-requests
+
+        :param response_cache: the ``ResponseCache`` to use, ``None`` disables caching
+        """
+        self._response_cache = response_cache
+
+    def stats(self) -> dict:
+        """
+        returns the counters and latencies of all requests sent since the start (or since ``reset_stats``)
+
+        The ``dict`` contains the totals (``requests``, ``errors``, ``retries``, ``cache_hits``, ``total_ms``,
+        ``bytes_in``, ``bytes_out``, ``skey_fetches`` and ``skeys_fetched``) and a list ``endpoints`` with one entry per
+        module, action and status-code. Each entry has the number of requests, the total, mean, maximum and estimated
+        median and 95th-percentile latency in milliseconds, a latency-histogram and the transferred bytes.
+
+        :return: a snapshot of the collected values
+        """
+        return self._metrics.snapshot()
+
+    def reset_stats(self):
+        """
+        drops the collected counters and latencies
+        """
+        self._metrics.reset()
+
+    def add_request_hook(self, before=None, after=None):
+        """
+        registers functions that are called before and after every request
+
+        Both are called with a ``RequestInfo`` describing the request, they can be plain functions or coroutines.
+        When ``after`` is called, the status-code, duration, transferred bytes, number of attempts and the exception
+        (if the request failed) are filled in. Exceptions raised by a hook are printed and otherwise ignored.
+
+        :param before: called before the request is sent
+        :param after: called after the request has finished or failed
+        """
+        if before is not None:
+            self._before_request_hooks.append(before)
+        if after is not None:
+            self._after_request_hooks.append(after)
+
+    def remove_request_hook(self, hook):
+        """
+        unregisters a function registered with ``add_request_hook``
+
+        :param hook: the function to remove
+        """
+        for hooks in (self._before_request_hooks, self._after_request_hooks):
+            while hook in hooks:
+                hooks.remove(hook)
+
+    async def _call_request_hooks(self, hooks: list, info: RequestInfo):
+        for hook in hooks:
+            try:
+                res = hook(info)
+                if inspect.isawaitable(res):
+                    await res
+            except Exception:
+                Dialog.print(traceback.format_exc())
+
+    if not is_pyodide_context():
+        def _create_session(self):
+            import requests
+            session = requests.sessions.Session()
+            adapter = requests.adapters.HTTPAdapter(
+                pool_connections=self._pool_connections,
+                pool_maxsize=self._pool_maxsize,
+            )
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            if not self._keep_alive:
+                session.headers["Connection"] = "close"
+            return session
+
+        def _create_executor(self):
+            return ThreadPoolExecutor(max_workers=self._pool_maxsize, thread_name_prefix="scriptor-request")
+
     if is_pyodide_context():
 
         async def init(self):
@@ -55,11 +257,7 @@ class Modules:
             authenticated; in the native Python context it performs a username/password login first.
             Must be called before any module can be retrieved with ``get_module``.
             """
-            resp = await self.viur_request("GET", "/config", renderer="vi")
-            try:
-                self._modules = resp["modules"]
-            except KeyError:
-                self._modules = []
+            await self._load_config()
     else:
         async def init(self):
             """
@@ -67,17 +265,23 @@ class Modules:
 
             In the native Python context this performs a username/password login and stores the
             resulting session cookies. If cookies were already provided at construction time, the
-            login step is skipped. Must be called before any module can be retrieved with
-            ``get_module``.
+            login step is skipped. With a ``session_cache``, the cookies of the last session are
+            reused if the backend still accepts them. Must be called before any module can be
+            retrieved with ``get_module``.
             """
-            self._session = requests.sessions.Session()
+            import requests
+            self._session = self._create_session()
+            if self._executor is None:
+                self._executor = self._create_executor()
 
-            def login():
-                skey = self._session.get(self._base_url + "/json/skey")
+            async def login():
+                # sent through WebRequest, so the login is recorded and replayed by a Cassette as well
+                skey = await WebRequest.request("GET", self._base_url + "/json/skey", session=self._session,
+                                                executor=self._executor)
 
                 kwargs = {
                     "data": {
-                        "skey": skey.json(),
+                        "skey": skey.as_object_from_json(),
                         "name": self._username,
                         "password": self._password
                     }
@@ -85,30 +289,61 @@ class Modules:
                 if self._login_skey:
                     kwargs["headers"] = {"X-Scriptor": self._login_skey}
 
-                response = self._session.post(self._base_url + "/vi/user/auth_userpassword/login?@vi-admin=true",
-                                              **kwargs)
+                response = await WebRequest.request(
+                    "POST", self._base_url + "/vi/user/auth_userpassword/login?@vi-admin=true",
+                    session=self._session, executor=self._executor, **kwargs
+                )
 
-                Dialog.print(f"""LOGIN RESPONSE:\n{response.content = }""")
+                Dialog.print(f"""LOGIN RESPONSE:\nresponse.content = {response.get_content()!r}""")
 
-                if response.status_code == 200 and (
-                    b"""JSON(("OKAY"))""" in response.content or response.json() != "FAILURE"):
+                if response.get_status_code() == 200 and (
+                    b"""JSON(("OKAY"))""" in response.get_content() or response.as_object_from_json() != "FAILURE"):
                     Dialog.print("LOGIN SUCCESS")
-                    self._cookies = requests.sessions.cookiejar_from_dict(self._session.cookies.get_dict())
+                    cookies = self._session.cookies.get_dict()
+                    if not cookies and (set_cookie := response.get_header("Set-Cookie")):
+                        # a replayed response doesn't pass through the session
+                        cookies = {key: morsel.value for key, morsel in SimpleCookie(set_cookie).items()}
+                    self._cookies = requests.sessions.cookiejar_from_dict(cookies)
                 else:
                     Dialog.print("LOGIN FAILED")
 
+            restored = False
+            if not self._cookies and self._session_cache is not None:
+                self._cookies = self._session_cache.load(self._base_url, self._username)
+                restored = bool(self._cookies)
+
+            logged_in = False
             if not self._cookies:
-                login()
+                await login()
+                logged_in = True
             else:
                 for key,value in self._cookies.items():
                     cookie_obj = requests.cookies.create_cookie(domain=self._base_url, name=key, value=value)
                     self._session.cookies.set_cookie(cookie_obj)
 
-            resp = await self.viur_request("GET", "/config", renderer="vi")
+            if restored and not await self._is_session_valid():
+                Dialog.print("stored session expired")
+                self._session_cache.delete(self._base_url, self._username)
+                self._session.cookies.clear()
+                self._cookies = None
+                await login()
+                logged_in = True
+            if logged_in and self._cookies and self._session_cache is not None:
+                self._session_cache.save(self._base_url, self._username, dict(self._cookies.items()))
+
+            await self._load_config()
+
+        async def _is_session_valid(self) -> bool:
+            try:
+                response = await self.viur_request("GET", "/user/view/self", raw=True)
+            except Exception:
+                return False
+            if response.get_status_code() != 200:
+                return False
             try:
-                self._modules = resp["modules"]
-            except KeyError:
-                self._modules = []
+                return bool(response.as_object_from_json().get("values"))
+            except (ValueError, AttributeError):
+                return False
 
     async def logout(self):
         """
@@ -117,12 +352,71 @@ class Modules:
         After calling this method, ``is_logged_in()`` returns ``False`` and ``get_module``
         can no longer be used until ``init()`` is called again.
         """
-        await self.viur_request("SECURE_POST", "/json/user/logout")
+        await self.viur_request("SECURE_POST", "/user/logout")
+        if self._session_cache is not None:
+            self._session_cache.delete(self._base_url, self._username)
+        if self._session is not None:
+            self._session.close()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
         self._session = None
+        self._executor = None
         self._cookies = None
         self._modules = None
+        self._skey_pool.invalidate()
         Dialog.print("logout success")
 
+    async def _load_config(self, revalidate: bool = False):
+        cache = self._config_cache
+        self._config_from_cache = False
+        if cache is None:
+            resp = await self.viur_request("GET", "/config", renderer="vi")
+        else:
+            url = join_url((self._base_url, "/vi/config"))
+            entry = await cache.load(url, self._username)
+            if entry is not None and not revalidate and entry.is_fresh(cache.ttl):
+                self._config_from_cache = True
+            else:
+                response = await self.viur_request("GET", "/config", renderer="vi", raw=True,
+                                                   headers=entry.get_validators() if entry is not None else None)
+                if response.get_status_code() == 304 and entry is not None:
+                    entry.stored_at = time.time()
+                elif 200 <= response.get_status_code() < 300:
+                    entry = CacheEntry(url=url, module="config", content=response.get_content(),
+                                       headers=response.get_headers())
+                else:
+                    # raises the matching exception
+                    return await self._load_config_without_cache()
+                await cache.save(url, self._username, entry)
+            resp = _codec.loads(entry.content)
+        self._set_config(resp)
+
+    async def _load_config_without_cache(self):
+        self._set_config(await self.viur_request("GET", "/config", renderer="vi"))
+
+    def _set_config(self, resp: dict):
+        try:
+            self._modules = resp["modules"]
+        except KeyError:
+            self._modules = []
+        self._module_classes = {}
+        if isinstance(self._modules, dict):
+            for name, details in self._modules.items():
+                if module_class := self._get_module_class(details):
+                    self._module_classes[name] = module_class
+
+    @classmethod
+    def _get_module_class(cls, details: dict):
+        _handler = details.get("handler", details.get("action"))
+        if not isinstance(_handler, str):
+            return None
+        if module_class := cls._handler_classes.get(_handler.split(".", 1)[0]):
+            return module_class
+        for key, value in cls._handler_classes.items():
+            if _handler.startswith(key):
+                return value
+        return None
+
     async def get_module(self, module_name: str):
         """
         gets a modules from the viur-backend
@@ -135,28 +429,16 @@ class Modules:
                            "_ipython_canary_method_should_not_exist_",
                            "_ipython_display_"):  # fixes iPython autocomplete and iPython-"repr"
             return None
-        modules_resolver = {
-            "tree": TreeModule,
-            "hierarchy": TreeModule,
-            "list": ListModule,
-            "singleton": SingletonModule
-        }
-
         details = self._modules.get(module_name,
                                     None)  # TODO? await self._viur_request("GET", module_name, None, renderer='vi')
+        if not details and self._config_from_cache:
+            # the stored catalogue might be outdated
+            await self._load_config(revalidate=True)
+            details = self._modules.get(module_name, None)
         if details:
-            module_type = None
-            for key, value in modules_resolver.items():
-                try:
-                    _handler = details["handler"]
-                except KeyError:
-                    try:
-                        _handler = details["action"]
-                    except KeyError:
-                        raise KeyError("details has no action and no handler")
-                if _handler.startswith(key):
-                    module_type = value
-                    break
+            if "handler" not in details and "action" not in details:
+                raise KeyError("details has no action and no handler")
+            module_type = self._module_classes.get(module_name)
 
             # If the module has a registered type
             if module_type:
@@ -178,13 +460,8 @@ class Modules:
                             else:
                                 raise ValueError(
                                     f"""exposed_list should be of type dict or list, is {type(exposed_list)}""")
-                            for exposed_name, data in exposed_list_iterator:
-                                method = Method(
-                                    exposed_name, module, data["accepts"],
-                                    skey=data.get("skey", None),
-                                    parent=True
-                                )
-                                details["instance"].register_route(exposed_name, method)
+                            # the Method-objects are created on first access
+                            module.register_exposed(dict(exposed_list_iterator))
                     except:
                         Dialog.print(traceback.format_exc())
 
@@ -199,35 +476,42 @@ class Modules:
         """
         return self._base_url
 
-    async def viur_request(self, method: str, url: str, params=None, renderer: str = None, raw: bool = False):
+    async def viur_request(self, method: str, url: str, params=None, renderer: str = None, raw: bool = False,
+                           stream: bool = False, headers: dict = None):
         """
         requests data from the viur server.
 
+        Identical ``GET``-requests (same url, parameters and renderer) that are running at the same time are only
+        sent once (unless ``single_flight`` has been disabled), every caller gets its own copy of the result.
+
         :param method: one of "GET", "POST", "PUT", "DELETE", "PATCH" or "SECURE_POST"
         :param url: the url of the requested resource
         :param params: additional parameters
         :param renderer: the viur-renderer for the requested data
         :param raw: if true the raw response will be returned
+        :param stream: if true (only together with ``raw``), the body isn't read and a ``WebStreamResponse`` is
+            returned, so large responses can be processed chunk by chunk
+        :param headers: additional HTTP-headers, requests with headers are neither cached nor shared
         :return: the requested data renderd by the renderer
         """
+        if stream and not raw:
+            raise ValueError("stream can only be used together with raw.")
         method = method.upper()
         if method not in ('GET', 'PUT', 'POST', 'DELETE', 'PATCH', 'SECURE_POST'):
             raise ValueError(
                 f"""method not supported: "{method}", """
                 """supported methods are GET, PUT, POST, DELETE, PATCH, SECURE_POST""")
-        if method == "SECURE_POST":
-            skey = await self.viur_request("GET", "/skey", renderer=renderer)
-            if isinstance(params, dict):
-                params["skey"] = skey
-            elif isinstance(params, list):
-                params.append(("skey", skey))
-            else:
-                params = {"skey": skey}
+        secure = method == "SECURE_POST"
+        if secure:
             method = "POST"
 
+        module = None
+        action = None
         if url and not any(url.startswith(prefix) for prefix in ('http://', 'https://', '//')):
             if not url.startswith("/"):
                 url = "/" + url
+            module, _, action = url.split("?", 1)[0].strip("/").partition("/")
+            action = action.split("/", 1)[0] or None
             prefix = f"""/{renderer}""" if renderer else "/json"
             url = prefix + url
             url = join_url((self._base_url, url))
@@ -238,9 +522,92 @@ class Modules:
                 url += "?" + _urlencode(params)
             else:
                 data = params
-        kwargs = self._viur_request_kwargs_collector(data=(data if method != "GET" else None))
 
-        response = await WebRequest.request(method, url, **kwargs)
+        info = RequestInfo("SECURE_POST" if secure else method, url, module, action)
+        if self._before_request_hooks:
+            await self._call_request_hooks(self._before_request_hooks, info)
+        trace_name = f"""{info.method} {module}/{action or ""}""" if module else f"""{info.method} {url}"""
+        try:
+            with tracing.span(trace_name, "request", url=url) as trace_span:
+                if stream:
+                    result = await self._send(method, url, params=params, data=data, secure=secure,
+                                              headers=headers, stream=True, info=info)
+                elif method == "GET" and self._single_flight and not headers:
+                    result = await self._single_flight_request(url, module, raw=raw, info=info)
+                else:
+                    result = await self._request(method, url, module, params=params, data=data, secure=secure,
+                                                 raw=raw, headers=headers, info=info)
+        except BaseException as e:
+            info.finish(error=e)
+            raise
+        else:
+            info.finish()
+        finally:
+            if method != "GET" and module and self._response_cache is not None:
+                # even if the request failed or was streamed, the server might have applied it
+                self._response_cache.invalidate_module(module)
+            trace_span.set(status=info.status, attempts=info.attempts, bytes_in=info.bytes_in,
+                           from_cache=info.from_cache, shared=info.shared)
+            self._metrics.record(info)
+            if self._after_request_hooks:
+                await self._call_request_hooks(self._after_request_hooks, info)
+        return result
+
+    async def _single_flight_request(self, url: str, module: str | None, raw: bool = False,
+                                     info: RequestInfo = None):
+        key = (url, raw)
+        if key not in self._inflight:
+            task = asyncio.ensure_future(self._request("GET", url, module, raw=raw, info=info))
+            self._inflight[key] = (task, info)
+            task.add_done_callback(functools.partial(self._forget_inflight, key))
+            # shielded, so a cancelled caller doesn't cancel the request for all the other callers
+            return await asyncio.shield(task)
+        task, leader_info = self._inflight[key]
+        if info is not None:
+            info.shared = True
+        try:
+            result = await asyncio.shield(task)
+        finally:
+            if info is not None and leader_info is not None:
+                info.status = leader_info.status
+                info.bytes_in = leader_info.bytes_in
+                info.from_cache = leader_info.from_cache
+        # every caller gets its own copy, so changing the result doesn't change the results of the others
+        return result if raw else copy.deepcopy(result)
+
+    def _forget_inflight(self, key, task):
+        if key in self._inflight and self._inflight[key][0] is task:
+            del self._inflight[key]
+
+    async def _request(self, method: str, url: str, module: str | None, params=None, data=None,
+                       secure: bool = False, raw: bool = False, headers: dict = None, info: RequestInfo = None):
+        cache = self._response_cache
+        cache_key = None
+        cache_entry = None
+        if cache is not None and method == "GET" and not raw and not headers and cache.is_cacheable(module):
+            cache_key = f"""{self._username or ""}|{url}"""
+            cache_entry = cache.get(cache_key)
+
+        if cache_entry is not None and cache_entry.is_fresh(cache.ttl):
+            response = cache_entry.to_response()
+            if info is not None:
+                info.from_cache = True
+        else:
+            response = await self._send(
+                method, url, params=params, data=data, secure=secure,
+                headers=cache_entry.get_validators() if cache_entry is not None else headers, info=info
+            )
+            if cache_key is not None:
+                if response.get_status_code() == 304 and cache_entry is not None:
+                    cache.touch(cache_key)
+                    response = cache_entry.to_response()
+                    if info is not None:
+                        info.from_cache = True
+                elif 200 <= response.get_status_code() < 300:
+                    cache.put(cache_key, module, response)
+        if info is not None:
+            info.status = response.get_status_code()
+
         if raw:
             return response
         if response.get_status_code() < 200 or response.get_status_code() >= 300:
@@ -256,11 +623,86 @@ class Modules:
                 raise exception(errormessage, response)
             else:
                 raise HTTPException(response.get_status_code(), "Http Error", errormessage, response)
+        if _codec.is_binary_content_type(response.get_header("Content-Type")):
+            return response.as_bytes()
         try:
             return response.as_object_from_json()
-        except json.JSONDecodeError:
+        except ValueError:
             return response.as_bytes()
 
+    async def _send(self, method: str, url: str, params=None, data=None, secure: bool = False,
+                    headers: dict = None, stream: bool = False, info: RequestInfo = None):
+        request_method = "SECURE_POST" if secure else method
+        retry_policy = self._retry_policy
+        attempt = 0
+        skey_rejected = False
+        while True:
+            attempt += 1
+            if secure:
+                data = self._add_skey(params, await self._skey_pool.acquire())
+            kwargs = self._viur_request_kwargs_collector(data=data)
+            if headers:
+                kwargs["headers"].update(headers)
+            if info is not None:
+                info.attempts += 1
+                info.bytes_out += self._get_body_size(kwargs, data)
+            try:
+                async with self._scheduler.slot(request_method):
+                    response = await WebRequest.request(method, url, session=self._session,
+                                                        executor=self._executor, stream=stream, **kwargs)
+            except Exception as e:
+                if retry_policy and retry_policy.should_retry(request_method, attempt, exception=e):
+                    await asyncio.sleep(retry_policy.get_delay(attempt))
+                    continue
+                raise
+            status_code = response.get_status_code()
+            if info is not None:
+                info.status = status_code
+                info.bytes_in += self._get_response_size(response, stream)
+            if secure and status_code == 412 and not skey_rejected:
+                # the skey has been rejected, the pooled keys are probably stale as well
+                skey_rejected = True
+                self._skey_pool.invalidate()
+                attempt -= 1
+                if stream:
+                    await response.close()
+                continue
+            if retry_policy and retry_policy.should_retry(request_method, attempt, status=status_code):
+                if stream:
+                    await response.close()
+                await asyncio.sleep(retry_policy.get_delay(attempt, response))
+                continue
+            return response
+
+    async def _fetch_skeys(self, amount: int = 1):
+        self._metrics.record_skey_fetch(amount)
+        return await self.viur_request("GET", "/skey", params={"amount": amount} if amount > 1 else None)
+
+    async def prefetch_skeys(self, amount: int):
+        """
+        fetches security-keys in advance, intended to be called before a burst of ``SECURE_POST``-requests
+
+        :param amount: the number of security-keys that should be available
+        """
+        await self._skey_pool.prefetch(amount)
+
+    @staticmethod
+    def _get_response_size(response, stream: bool = False) -> int:
+        if stream:
+            try:
+                return int(response.get_header("Content-Length", 0))
+            except ValueError:
+                return 0
+        return len(response.get_content())
+
+    @staticmethod
+    def _add_skey(params, skey: str):
+        if isinstance(params, dict):
+            return params | {"skey": skey}
+        elif isinstance(params, list):
+            return [item for item in params if item[0] != "skey"] + [("skey", skey)]
+        return {"skey": skey}
+
     if is_pyodide_context():
         def _viur_request_kwargs_collector(self, data=None):
             from . import params
@@ -271,17 +713,13 @@ class Modules:
             if params.get("__is_dev__"):
                 kwargs["credentials"] = "include"
             if data:
-                if isinstance(data, dict):
-                    raw_fd = flatten_dict(data)
-                elif isinstance(data, list):
-                    raw_fd = data
-                else:
-                    raise ValueError(f"data must be a dict or FormData, but is {type(data)}")
-                fd = FormData.new()
-                for k, v in raw_fd:
-                    fd.append(k, v)
-                kwargs["body"] = fd
+                kwargs.update(encode_body(data))
             return kwargs
+
+        @staticmethod
+        def _get_body_size(kwargs: dict, data=None) -> int:
+            # the body is a javascript-object, its size is estimated from the parameters
+            return estimate_body_size(data) if data else 0
     else:
         def _viur_request_kwargs_collector(self, data=None):
             kwargs = {
@@ -292,11 +730,16 @@ class Modules:
             else:
                 raise RuntimeError("You need to log in.")
             if data:
-                payload_data, payload_header = encode_multipart_formdata(data)
-                kwargs["data"] = payload_data
-                kwargs["headers"]["Content-Type"] = payload_header
+                body = encode_body(data)
+                kwargs["data"] = body["data"]
+                kwargs["headers"].update(body["headers"])
             return kwargs
 
+        @staticmethod
+        def _get_body_size(kwargs: dict, data=None) -> int:
+            body = kwargs.get("data")
+            return len(body) if body is not None else 0
+
     def __repr__(self):
         if self._modules is None:
             module_list = "uninitialized"
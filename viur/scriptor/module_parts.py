@@ -1,6 +1,13 @@
-from ._utils import join_url
+import asyncio
+import logging
+from ._utils import join_url, read_ahead, ConsumeQueue, map_concurrently
+from . import tracing
+from .cursor import ListCursor
+from .bulk import BulkResult
 import typing
 
+logger = logging.getLogger(__name__)
+
 
 class BaseModule:
     """
@@ -16,6 +23,7 @@ class BaseModule:
         super().__init__()
         self._name = name
         self._routes = {}
+        self._exposed = {}
         self._parent = parent
 
     def __repr__(self):
@@ -43,6 +51,18 @@ class BaseModule:
         """
         self._routes[name] = method
 
+    def register_exposed(self, exposed: dict):
+        """
+        Registers the custom server-side methods listed in the module-catalogue of the backend. The ``Method``
+        instance of a method is created and registered when it's accessed for the first time.
+
+        :param exposed: maps the names of the methods to their description (with ``accepts`` and ``skey``)
+        """
+        self._exposed = exposed
+
+    def __dir__(self):
+        return list(super().__dir__()) + [name for name in self._exposed if name not in self._routes]
+
     @staticmethod
     def _build_url(action: str, url: str, module: str, group: str = "", key: str = "", skel_type: str = ""):
         _url = url
@@ -59,8 +79,12 @@ class BaseModule:
         return join_url(_url)
 
     def __getattr__(self, name: str):
-        if ret := self._routes.get(name, None):
+        if ret := self.__dict__.get("_routes", {}).get(name, None):
             return ret
+        if isinstance(data := self.__dict__.get("_exposed", {}).get(name, None), dict):
+            method = Method(name, self, data.get("accepts", None), skey=data.get("skey", None), parent=True)
+            self.register_route(name, method)
+            return method
         raise AttributeError(f"""'{self.__class__.__name__}' object hast no attribute '{name}'""")
 
     async def preview(self, params: dict = None, group: str = "", skel_type: str = "", **kwargs):
@@ -91,6 +115,33 @@ class BaseModule:
         else:
             return res
 
+    async def view_many(self, keys: typing.Iterable[str] | typing.AsyncIterable[str], concurrency: int = 10,
+                        ordered: bool = True, **kwargs):
+        """
+        retrieves many records by their keys, up to ``concurrency`` requests are sent at the same time
+
+        A failed request doesn't stop the others, its exception is returned in place of the record.
+
+        .. code-block:: python
+
+            async for key, result in module.view_many(keys, concurrency=20):
+                if isinstance(result, Exception):
+                    print(f"{key} failed: {result}")
+
+        :param keys: the keys of the records, an iterable or asynchronous iterable
+        :param concurrency: the maximum number of requests running at the same time
+        :param ordered: if true, the records are yielded in the order of ``keys``, otherwise as soon as they arrive
+        :param kwargs: additional keyword-arguments for ``view`` (i.e. ``group`` or ``skel_type``)
+        :return: an asynchronous generator yielding ``(key, record)``-tuples, ``record`` is the exception if the
+            request failed
+        """
+
+        async def view(key: str):
+            return await self.view(key, **kwargs)
+
+        async for key, result in map_concurrently(view, keys, concurrency=concurrency, ordered=ordered):
+            yield key, result
+
     async def edit(self, key: str = "", params: dict = None, group: str = "", skel_type: str = "", **kwargs):
         _url = kwargs.get('url', '')
         _renderer = kwargs.get('renderer', '')
@@ -180,6 +231,8 @@ class ExtendedModule(BaseModule):
         skel_type: str = "",
         limit: int = None,
         min_limit: int = None,
+        prefetch: int = 0,
+        cursor: ListCursor = None,
         **kwargs
     ):
         """
@@ -192,14 +245,48 @@ class ExtendedModule(BaseModule):
         :param skel_type: the skel type (for ``TreeModule``; either ``"node"`` or ``"leaf"``)
         :param limit: maximum number of records to yield; fetches all if omitted
         :param min_limit: stop fetching after at least this many records have been yielded
+        :param prefetch: the number of pages fetched in the background while the current page is consumed, ``0``
+            fetches the next page only after the current one has been consumed
+        :param cursor: a ``ListCursor`` that keeps the position of this iteration, a cursor that has been used
+            before continues its iteration
         :param kwargs: additional keyword-arguments
         :return: an async generator yielding the retrieved records
         """
-        if not params:
-            params = {}
-        _url = kwargs.get('url', '')
-        _renderer = kwargs.get('renderer', '')
+        if cursor is None:
+            cursor = ListCursor()
+        if cursor.url is None:
+            cursor.url = self._get_list_url(group=group, skel_type=skel_type, **kwargs)
+            cursor.params = dict(params or {})
+            cursor.renderer = kwargs.get('renderer', '')
+        if cursor.done:
+            return
+        pages = self._iter_pages(cursor.url, cursor.params, cursor.renderer, cursor.page_cursor)
+        if prefetch:
+            pages = read_ahead(pages, prefetch)
+        skip = cursor.offset
+        counter = 0
+        try:
+            async for request_cursor, batch, next_cursor in pages:
+                cursor.page_cursor = request_cursor
+                for index in range(skip, len(batch)):
+                    # a record counts as consumed once it's yielded, a resumed iteration continues after it
+                    cursor.offset = index + 1
+                    yield batch[index]
+                    counter += 1
+                    if limit and counter >= limit:
+                        return
+                skip = 0
+                if next_cursor:
+                    cursor.page_cursor = next_cursor
+                    cursor.offset = 0
+                if min_limit and counter >= min_limit:
+                    return
+            cursor.done = True
+        finally:
+            await pages.aclose()
 
+    def _get_list_url(self, group: str = "", skel_type: str = "", **kwargs) -> str:
+        _url = kwargs.get('url', '')
         if not _url:
             _url = [self._name, "list"]
             if skel_type:
@@ -207,37 +294,32 @@ class ExtendedModule(BaseModule):
             if group:
                 _url.append(group)
             _url = join_url(_url)
+        return _url
 
-        batch = []
-        cursor = None
-        fetched = False
+    def _list_pages(self, params: dict = None, group: str = "", skel_type: str = "", **kwargs):
+        url = self._get_list_url(group=group, skel_type=skel_type, **kwargs)
+        return self._iter_pages(url, params or {}, kwargs.get('renderer', ''))
 
-        counter = 0
+    async def _iter_pages(self, url: str, params: dict, renderer: str, cursor: str = None):
+        # yields the cursor each page was requested with, its records and the cursor of the next page
+        params = dict(params)
+        page = 0
         while True:
-            for i in batch:
-                yield i
-                counter += 1
-                if limit and counter >= limit:
-                    return
-            if fetched and not cursor:
-                return
             if cursor:
                 params["cursor"] = cursor
-                self._cursor = cursor
-            if min_limit and counter >= min_limit:
-                return
-            ret = await self._parent.viur_request("GET", _url, params, _renderer)
-            fetched = True
-            if not ret:
+            with tracing.span(f"""{self._name}.list page""", "list", page=page) as trace_span:
+                ret = await self._parent.viur_request("GET", url, params, renderer)
+                trace_span.set(records=len(ret["skellist"]) if ret else 0)
+            page += 1
+            if not ret or not ret['skellist']:
                 self._cursor = None
                 return
-            batch = ret['skellist']
-            # batch.reverse()
-            cursor = ret['cursor']
-            self._cursor = cursor
-            if not batch:
-                cursor = None
-                self._cursor = None
+            next_cursor = ret['cursor']
+            self._cursor = next_cursor
+            yield cursor, ret['skellist'], next_cursor
+            if not next_cursor:
+                return
+            cursor = next_cursor
 
     async def add(self, params: dict = None, group: str = "", skel_type: str = "", **kwargs):
         """
@@ -268,6 +350,112 @@ class ExtendedModule(BaseModule):
         url = self._build_url(action='delete', url=_url, module=self._name, key=key)
         return (await self._parent.viur_request("SECURE_POST", url=url, params=params, renderer=_renderer)) == "OKAY"
 
+    async def add_many(self, items: typing.Iterable[dict] | typing.AsyncIterable[dict], concurrency: int = 10,
+                       **kwargs) -> BulkResult:
+        """
+        adds many records, up to ``concurrency`` requests are sent at the same time
+
+        A failed request doesn't stop the others, its exception is stored in place of the response.
+
+        .. code-block:: python
+
+            result = await person.add_many(({"name": row[0]} for row in rows), concurrency=20)
+            print(result.report())
+            for index, params, exception in result.errors:
+                print(f"row {index} failed: {exception}")
+
+        :param items: the field values of the new records, an iterable or asynchronous iterable of ``dict``\\ s
+        :param concurrency: the maximum number of requests running at the same time
+        :param kwargs: additional keyword-arguments for ``add`` (i.e. ``group`` or ``skel_type``)
+        :return: a ``BulkResult`` with the ``(params, response)``-tuples in the order of ``items``
+        """
+
+        async def add(params: dict):
+            return await self.add(params=params, **kwargs)
+
+        return await self._run_bulk("add_many", add, items, concurrency)
+
+    async def edit_many(self, items, concurrency: int = 10, **kwargs) -> BulkResult:
+        """
+        writes changes to many records, up to ``concurrency`` requests are sent at the same time
+
+        A failed request doesn't stop the others, its exception is stored in place of the response.
+
+        .. code-block:: python
+
+            result = await person.edit_many((entry["key"], {"status": "archived"}) for entry in entries)
+
+        :param items: an iterable or asynchronous iterable of ``(key, params)``-tuples or of ``dict``\\ s with the
+            field values that contain the ``"key"``
+        :param concurrency: the maximum number of requests running at the same time
+        :param kwargs: additional keyword-arguments for ``edit`` (i.e. ``group`` or ``skel_type``)
+        :return: a ``BulkResult`` with the ``(item, response)``-tuples in the order of ``items``
+        """
+
+        async def edit(item):
+            key, params = self._split_bulk_item(item)
+            return await self.edit(key=key, params=params, **kwargs)
+
+        return await self._run_bulk("edit_many", edit, items, concurrency)
+
+    async def add_or_edit_many(self, items, concurrency: int = 10, **kwargs) -> BulkResult:
+        """
+        writes changes to many records or creates them if they don't exist, up to ``concurrency`` requests are sent
+        at the same time
+
+        A failed request doesn't stop the others, its exception is stored in place of the response.
+
+        :param items: an iterable or asynchronous iterable of ``(key, params)``-tuples or of ``dict``\\ s with the
+            field values that contain the ``"key"``
+        :param concurrency: the maximum number of requests running at the same time
+        :param kwargs: additional keyword-arguments for ``add_or_edit`` (i.e. ``group`` or ``skel_type``)
+        :return: a ``BulkResult`` with the ``(item, response)``-tuples in the order of ``items``
+        """
+
+        async def add_or_edit(item):
+            key, params = self._split_bulk_item(item)
+            return await self.add_or_edit(key=key, params=params, **kwargs)
+
+        return await self._run_bulk("add_or_edit_many", add_or_edit, items, concurrency)
+
+    @staticmethod
+    def _split_bulk_item(item) -> tuple[str, dict]:
+        if isinstance(item, dict):
+            params = dict(item)
+            try:
+                return params.pop("key"), params
+            except KeyError:
+                raise ValueError("The item has no key.") from None
+        key, params = item
+        return key, params
+
+    async def _run_bulk(self, action: str, func, items, concurrency: int) -> BulkResult:
+        result = BulkResult(f"""{self._name}.{action}""")
+        prefetch = None
+
+        async def prefetch_skeys():
+            # only an optimization, if it fails every request fetches its own key
+            try:
+                await self._parent.prefetch_skeys(concurrency)
+            except Exception as e:
+                logger.warning(f"""{result.operation}: prefetching the security-keys failed """
+                               f"""({type(e).__name__}: {e})""")
+
+        async def run(item):
+            # the security-keys are fetched with the first item, an empty input doesn't fetch any
+            nonlocal prefetch
+            if prefetch is None:
+                prefetch = asyncio.ensure_future(prefetch_skeys())
+            await prefetch
+            return await func(item)
+
+        with tracing.span(result.operation, "bulk", concurrency=concurrency) as trace_span:
+            async for item, response in map_concurrently(run, items, concurrency=concurrency, ordered=True):
+                result.append(item, response)
+            result.finish()
+            trace_span.set(items=len(result), errors=len(result.errors))
+        return result
+
 
 class ListModule(ExtendedModule):
     """
@@ -332,7 +520,8 @@ class ListModule(ExtendedModule):
         """
         return await super().add_or_edit(key=key, params=params, group=group, **kwargs)
 
-    async def list(self, params: dict = None, group: str = "", limit: int = None, min_limit: int = None, **kwargs):
+    async def list(self, params: dict = None, group: str = "", limit: int = None, min_limit: int = None,
+                   prefetch: int = 0, cursor: ListCursor = None, **kwargs):
         """
         retrieves multiple records from the database (all if called without parameters)
 
@@ -341,12 +530,131 @@ class ListModule(ExtendedModule):
         :param limit: maximum amount of entries that should be fetched.
             Note: The amount of entries per request/batch must be specified as "limit" in the params.
         :param min_limit: minimum amount of entries that should be fetched if batch size is larger there are more records.
+        :param prefetch: the number of pages fetched in the background while the current page is consumed
+        :param cursor: a ``ListCursor`` that keeps the position of this iteration to continue it later
         :param kwargs: additional keyword-arguments
         :return: an asynchronous generator yielding the retrieved records
         """
-        async for i in super().list(params=params, group=group, limit=limit, min_limit=min_limit, **kwargs):
+        async for i in super().list(params=params, group=group, limit=limit, min_limit=min_limit, prefetch=prefetch,
+                                    cursor=cursor, **kwargs):
             yield i
 
+    async def list_parallel(
+        self,
+        params: dict = None,
+        group: str = "",
+        shards: typing.List[dict] = None,
+        bone: str = None,
+        boundaries: typing.List = None,
+        ordered: bool = False,
+        concurrency: int = 4,
+        prefetch: int = 1,
+        limit: int = None,
+        **kwargs
+    ):
+        """
+        retrieves multiple records like ``list``, but splits the query into disjoint shards whose pages are fetched
+        concurrently
+
+        The shards are either given as ``shards``, a ``list`` of additional filter-parameters (each record must match
+        exactly one of them), or they are built from ``boundaries``, values of the indexed ``bone`` that split it into
+        ranges: ``bone="age", boundaries=[18, 65]`` creates the shards ``age$lt=18``, ``age=18``,
+        ``age$gt=18&age$lt=65``, ``age=65`` and ``age$gt=65``, which are sorted by ``age``.
+
+        .. code-block:: python
+
+            async for entry in person.list_parallel(bone="name", boundaries=["g", "n", "t"], concurrency=4):
+                ...
+
+        :param params: parameters to pass to the database, they apply to all shards
+        :param group: the group the records belong to
+        :param shards: the filter-parameters of the shards
+        :param bone: the bone the ``boundaries`` belong to, the shards are ordered by it (a different ``orderby`` in
+            ``params`` raises a ``ValueError``)
+        :param boundaries: the values that split ``bone`` into shards
+        :param ordered: if true, the records are yielded shard by shard in the order of the shards (i.e. sorted by
+            ``bone``), otherwise in the order they arrive
+        :param concurrency: the maximum number of shards fetched at the same time
+        :param prefetch: the number of pages buffered per shard, with ``ordered`` the shards after the current one can
+            only be fetched that far ahead, so a larger value speeds up ordered results
+        :param limit: maximum amount of entries that should be fetched
+        :param kwargs: additional keyword-arguments
+        :return: an asynchronous generator yielding the retrieved records
+        """
+        assert (shards is None) != (bone is None), "Either shards or bone and boundaries must be given."
+        assert concurrency > 0, "concurrency must be positive"
+        if bone is not None:
+            if (params or {}).get("orderby", bone) != bone:
+                raise ValueError(f"""The shards of "{bone}" must be ordered by "{bone}", """
+                                 f"""not by "{params['orderby']}".""")
+            shards = self._build_shards(bone, boundaries or [])
+            params = {**(params or {}), "orderby": bone}
+        shard_params = [{**(params or {}), **shard} for shard in shards]
+
+        def get_pages(index: int):
+            return self._list_pages(params=shard_params[index], group=group, **kwargs)
+
+        if ordered:
+            pages = self._merge_shards_ordered(get_pages, len(shard_params), concurrency, prefetch)
+        else:
+            pages = self._merge_shards(get_pages, len(shard_params), concurrency, prefetch)
+        counter = 0
+        try:
+            async for _, batch, _ in pages:
+                for i in batch:
+                    yield i
+                    counter += 1
+                    if limit and counter >= limit:
+                        return
+        finally:
+            await pages.aclose()
+
+    @staticmethod
+    def _build_shards(bone: str, boundaries: typing.List) -> typing.List[dict]:
+        shards = []
+        lower = None
+        for boundary in sorted(set(boundaries)):
+            shard = {f"""{bone}$lt""": boundary}
+            if lower is not None:
+                shard[f"""{bone}$gt"""] = lower
+            shards.append(shard)
+            shards.append({bone: boundary})
+            lower = boundary
+        shards.append({f"""{bone}$gt""": lower} if lower is not None else {})
+        return shards
+
+    @staticmethod
+    async def _merge_shards_ordered(get_pages, count: int, concurrency: int, prefetch: int):
+        # reads up to `concurrency` shards ahead and yields their pages in the order of the shards
+        readers = []
+        try:
+            for index in range(count):
+                while len(readers) < min(index + concurrency, count):
+                    readers.append(read_ahead(get_pages(len(readers)), max(prefetch, 1)))
+                async for page in readers[index]:
+                    yield page
+        finally:
+            for reader in readers:
+                await reader.aclose()
+
+    @staticmethod
+    def _merge_shards(get_pages, count: int, concurrency: int, prefetch: int):
+        # fetches up to `concurrency` shards at the same time and yields their pages as they arrive
+        queue = asyncio.Queue(maxsize=concurrency * max(prefetch, 1))
+        indexes = iter(range(count))
+
+        async def worker():
+            for index in indexes:
+                pages = get_pages(index)
+                try:
+                    async for page in pages:
+                        await queue.put(page)
+                finally:
+                    await pages.aclose()
+
+        tasks = [asyncio.ensure_future(worker()) for _ in range(min(concurrency, count))]
+        return ConsumeQueue(queue, tasks)
+
     async def add(self, params: dict = None, group: str = "", **kwargs):
         """
         adds a record to the database
@@ -469,7 +777,8 @@ class TreeModule(ExtendedModule):
         """
         return await super().edit(key=key, params=params, skel_type=skel_type, **kwargs)
 
-    async def list(self, params: dict = None, skel_type: str = "", limit: int = None, min_limit: int = None, **kwargs):
+    async def list(self, params: dict = None, skel_type: str = "", limit: int = None, min_limit: int = None,
+                   prefetch: int = 0, cursor: ListCursor = None, **kwargs):
         """
         retrieves multiple records from the database (all if called without parameters)
 
@@ -478,10 +787,13 @@ class TreeModule(ExtendedModule):
         :param limit: maximum amount of entries that should be fetched.
             Note: The amount of entries per request/batch must be specified as "limit" in the params.
         :param min_limit: minimum amount of entries that should be fetched if batch size is larger there are more records.
+        :param prefetch: the number of pages fetched in the background while the current page is consumed
+        :param cursor: a ``ListCursor`` that keeps the position of this iteration to continue it later
         :param kwargs: additional keyword-arguments
         :return: an asynchronous generator yielding the retrieved records
         """
-        async for i in super().list(params=params, skel_type=skel_type, limit=limit, min_limit=min_limit, **kwargs):
+        async for i in super().list(params=params, skel_type=skel_type, limit=limit, min_limit=min_limit,
+                                    prefetch=prefetch, cursor=cursor, **kwargs):
             yield i
 
     async def add(self, params: dict = None, skel_type: str = "", **kwargs):
@@ -581,7 +893,7 @@ class Method:
         return result
 
     def __getattr__(self, name: str):
-        if self._attr:
-            if name in self._attr:
-                return self._attr[name]
+        if attr := self.__dict__.get("_attr", None):
+            if name in attr:
+                return attr[name]
         raise AttributeError(f"""'{self.__class__.__name__}' object hast no attribute '{name}'""")
@@ -1,4 +1,6 @@
-import requests
+import asyncio
+import functools
+import inspect
 from .file import File
 from ._utils import is_pyodide_context
 
@@ -12,6 +14,8 @@ class WebRequest:
     provides methods to request data from HTTP-Servers
     """
 
+    _cassette = None
+
     @classmethod
     async def get(cls, url, params=None, headers=None, **kwargs):
         """
@@ -78,42 +82,106 @@ class WebRequest:
         """
         return await cls.request(method='DELETE', url=url, params=params, data=data, headers=headers, **kwargs)
 
+    @classmethod
+    async def request(cls, method: str, url, **kwargs):
+        """
+        handles general HTTP-requests
+
+        If a ``Cassette`` is set (see ``set_cassette``), the request is recorded or answered from the cassette.
+
+        :param method: the method to use (GET, PUT, POST or DELETE)
+        :param url: the URL of the endpoint
+        :param session: (optional, native Python only) a ``requests.Session`` whose connection-pool should be used
+        :param executor: (optional, native Python only) the ``concurrent.futures.Executor`` the request is run in
+        :param stream: if true, the body isn't read and a ``WebStreamResponse`` is returned
+        :param kwargs: additional parameters
+        :return: ``WebResponse`` (or ``WebStreamResponse`` if ``stream`` is true)
+        """
+        if cls._cassette is not None:
+            return await cls._cassette.handle(cls._transport, method, url, **kwargs)
+        return await cls._transport(method, url, **kwargs)
+
+    @classmethod
+    def set_cassette(cls, cassette):
+        """
+        sets a ``Cassette`` that records all requests or answers them with recorded responses
+
+        :param cassette: the ``Cassette``, ``None`` sends all requests to the server again
+        """
+        cls._cassette = cassette
+
+    @classmethod
+    def get_cassette(cls):
+        """
+        returns the ``Cassette`` set with ``set_cassette``
+
+        :return: the ``Cassette`` or ``None``
+        """
+        return cls._cassette
+
     if is_pyodide_context():
         @classmethod
-        async def request(cls, method: str, url, **kwargs):
+        async def _transport(cls, method: str, url, **kwargs):
             """
-            handles general HTTP-requests
+            sends a HTTP-request with ``fetch``
 
             :param method: the method to use (GET, PUT, POST or DELETE)
             :param url: the URL of the endpoint
+            :param session: ignored in the browser, connections are handled by the browser
+            :param executor: ignored in the browser, ``fetch`` doesn't block the event-loop
+            :param stream: if true, the body isn't read and a ``WebStreamResponse`` is returned
             :param kwargs: additional parameters
-            :return: ``WebResponse``
+            :return: ``WebResponse`` (or ``WebStreamResponse`` if ``stream`` is true)
             """
             mup = method.upper()
             assert mup in ("GET", "POST", "PUT", "DELETE"), "invalid method: only GET, POST, PUT and DELETE are allowed"
+            kwargs.pop("session", None)
+            kwargs.pop("executor", None)
+            stream = kwargs.pop("stream", False)
             params = {"method": mup}
             params.update(kwargs)
             if "headers" in params:
                 params["headers"] = to_js(params["headers"])
             res = await js.fetch(url, **params)
+            headers = {key: value for key, value in res.headers.entries()}
+            if stream:
+                return WebStreamResponse(url=url, http_status_code=res.status, headers=headers, raw_response=res)
             content = (await res.arrayBuffer()).to_bytes()
-            return WebResponse(url=url, http_status_code=res.status, content=content)
+            return WebResponse(url=url, http_status_code=res.status, content=content, headers=headers)
 
     else:
         @classmethod
-        async def request(cls, method: str, url, **kwargs):
+        async def _transport(cls, method: str, url, **kwargs):
             """
-            handles general HTTP-requests
+            sends a HTTP-request with ``requests``
+
+            The blocking request is run in a thread-pool, so the event-loop keeps running while waiting for the
+            response and concurrent requests (i.e. with ``asyncio.gather``) overlap.
 
             :param method: the method to use (GET, PUT, POST or DELETE)
             :param url: the URL of the endpoint
+            :param session: (optional) a ``requests.Session`` whose connection-pool should be used
+            :param executor: (optional) the ``concurrent.futures.Executor`` the request is run in, defaults to the
+                default executor of the event-loop
+            :param stream: if true, the body isn't read and a ``WebStreamResponse`` is returned
             :param kwargs: additional parameters
-            :return: ``WebResponse``
+            :return: ``WebResponse`` (or ``WebStreamResponse`` if ``stream`` is true)
             """
             mup = method.upper()
             assert mup in ("GET", "POST", "PUT", "DELETE"), "invalid method: only GET, POST, PUT and DELETE are allowed"
-            res = requests.request(method=mup, url=url, **kwargs)
-            return WebResponse(url=url, http_status_code=res.status_code, content=res.content)
+            session = kwargs.pop("session", None)
+            if session is None:
+                import requests
+                session = requests
+            executor = kwargs.pop("executor", None)
+            stream = kwargs.pop("stream", False)
+            loop = asyncio.get_running_loop()
+            res = await loop.run_in_executor(
+                executor, functools.partial(session.request, method=mup, url=url, stream=stream, **kwargs))
+            if stream:
+                return WebStreamResponse(url=url, http_status_code=res.status_code, headers=res.headers,
+                                         raw_response=res, executor=executor)
+            return WebResponse(url=url, http_status_code=res.status_code, content=res.content, headers=res.headers)
 
 
 class WebResponse(File):
@@ -121,10 +189,11 @@ class WebResponse(File):
     represents the result of a ``WebRequest``, can have the requested content or information about errors.
     """
 
-    def __init__(self, url, http_status_code, content):
+    def __init__(self, url, http_status_code, content, headers: dict = None):
         super().__init__(content, url.rsplit('/', 1)[-1].split('?', 1)[0])
         self._url = url
         self._http_status_code = http_status_code
+        self._headers = {key.lower(): value for key, value in (headers or {}).items()}
 
     def __repr__(self):
         return f"""<{self.__class__.__name__} filename="{self.filename}", status_code={self._http_status_code}, """ \
@@ -146,6 +215,24 @@ class WebResponse(File):
         """
         return self._http_status_code
 
+    def get_headers(self):
+        """
+        returns the HTTP-headers of the response (with lowercase names)
+
+        :return: ``dict`` of the HTTP-headers
+        """
+        return self._headers
+
+    def get_header(self, name: str, default=None):
+        """
+        returns a single HTTP-header of the response
+
+        :param name: the name of the header (case-insensitive)
+        :param default: the value returned if the header is missing
+        :return: the value of the header
+        """
+        return self._headers.get(name.lower(), default)
+
     def get_content(self):
         """
         returns the content of the HTTP-response
@@ -153,3 +240,149 @@ class WebResponse(File):
         :return: the content of the HTTP-response
         """
         return self._data
+
+
+class WebStreamResponse:
+    """
+    represents the result of a ``WebRequest`` with ``stream=True``. The headers are available right away, the body is
+    read in chunks with ``iter_chunks``, so large downloads don't have to fit into memory.
+
+    Use it as ``async with``-context-manager or call ``close`` when you don't read the whole body.
+    """
+
+    def __init__(self, url, http_status_code, headers: dict, raw_response, executor=None):
+        self.filename = url.rsplit('/', 1)[-1].split('?', 1)[0]
+        self._url = url
+        self._http_status_code = http_status_code
+        self._headers = {key.lower(): value for key, value in (headers or {}).items()}
+        self._raw_response = raw_response
+        self._executor = executor
+        self._closed = False
+
+    def __repr__(self):
+        return f"""<{self.__class__.__name__} filename="{self.filename}", status_code={self._http_status_code}>"""
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    def get_url(self):
+        """
+        returns the url that was requested
+
+        :return: the url that was requested
+        """
+        return self._url
+
+    def get_status_code(self):
+        """
+        returns the HTTP-status-code returned from the server
+
+        :return: the HTTP-status-code
+        """
+        return self._http_status_code
+
+    def get_headers(self):
+        """
+        returns the HTTP-headers of the response (with lowercase names)
+
+        :return: ``dict`` of the HTTP-headers
+        """
+        return self._headers
+
+    def get_header(self, name: str, default=None):
+        """
+        returns a single HTTP-header of the response
+
+        :param name: the name of the header (case-insensitive)
+        :param default: the value returned if the header is missing
+        :return: the value of the header
+        """
+        return self._headers.get(name.lower(), default)
+
+    if is_pyodide_context():
+        async def iter_chunks(self, chunk_size: int = 65536):
+            """
+            reads the body of the response chunk by chunk
+
+            :param chunk_size: ignored in the browser, the chunks have the size the browser receives them in
+            :return: an asynchronous generator yielding the chunks as ``bytes``
+            """
+            if self._closed:
+                raise RuntimeError("This response is already closed.")
+            reader = self._raw_response.body.getReader()
+            try:
+                while True:
+                    chunk = await reader.read()
+                    if chunk.done:
+                        break
+                    yield chunk.value.to_bytes()
+            finally:
+                reader.releaseLock()
+                await self.close()
+
+        async def close(self):
+            """
+            closes the response, the rest of the body is discarded
+            """
+            if not self._closed:
+                self._closed = True
+                if self._raw_response.body is not None:
+                    await self._raw_response.body.cancel()
+    else:
+        async def iter_chunks(self, chunk_size: int = 65536):
+            """
+            reads the body of the response chunk by chunk
+
+            :param chunk_size: the maximum size of a chunk in bytes
+            :return: an asynchronous generator yielding the chunks as ``bytes``
+            """
+            if self._closed:
+                raise RuntimeError("This response is already closed.")
+            loop = asyncio.get_running_loop()
+            chunks = self._raw_response.iter_content(chunk_size=chunk_size)
+            end = object()
+            try:
+                while (chunk := await loop.run_in_executor(self._executor, next, chunks, end)) is not end:
+                    yield chunk
+            finally:
+                await self.close()
+
+        async def close(self):
+            """
+            closes the response, the rest of the body is discarded and the connection is returned to the pool
+            """
+            if not self._closed:
+                self._closed = True
+                self._raw_response.close()
+
+    async def read(self) -> WebResponse:
+        """
+        reads the whole body into memory
+
+        :return: a ``WebResponse`` with the complete body
+        """
+        content = bytearray()
+        async for chunk in self.iter_chunks():
+            content += chunk
+        return WebResponse(url=self._url, http_status_code=self._http_status_code, content=bytes(content),
+                           headers=self._headers)
+
+    async def write_to(self, writable, chunk_size: int = 65536) -> int:
+        """
+        writes the body to a writable object chunk by chunk, i.e. a file opened with
+        ``DirectoryHandler.open_file_for_writing`` or a file-object opened with ``open(..., "wb")``
+
+        :param writable: an object with a (synchronous or asynchronous) ``write``-method accepting ``bytes``
+        :param chunk_size: the maximum size of a chunk in bytes (ignored in the browser)
+        :return: the number of bytes written
+        """
+        written = 0
+        async for chunk in self.iter_chunks(chunk_size=chunk_size):
+            res = writable.write(chunk)
+            if inspect.isawaitable(res):
+                await res
+            written += len(chunk)
+        return written
@@ -0,0 +1,150 @@
+import datetime
+import email.utils
+import random
+from ._utils import is_pyodide_context
+
+_error_types = None
+
+
+def _get_error_types() -> tuple[tuple, tuple]:
+    # resolved on first use, so requests isn't imported at startup
+    global _error_types
+    if _error_types is None:
+        if is_pyodide_context():
+            from pyodide.ffi import JsException
+
+            _error_types = ((JsException,), ())
+        else:
+            import requests
+            import urllib3
+
+            _error_types = (
+                (requests.exceptions.ConnectionError, requests.exceptions.Timeout),
+                # the connection couldn't be established (refused, unresolvable host or timed out)
+                (requests.exceptions.ConnectTimeout, urllib3.exceptions.NewConnectionError,
+                 urllib3.exceptions.ConnectTimeoutError),
+            )
+    return _error_types
+
+
+def _is_connection_setup_error(exception: Exception) -> bool:
+    connect_errors = _get_error_types()[1]
+    if isinstance(exception, connect_errors):
+        return True
+    # requests wraps the error of urllib3 (i.e. a refused connection) in a ConnectionError
+    reason = exception.args[0] if exception.args else None
+    reason = getattr(reason, "reason", reason)
+    return isinstance(reason, connect_errors)
+
+
+class RetryPolicy:
+    """
+    Decides if and when a failed request to the viur-backend is repeated.
+
+    Requests are retried on connection-errors and on status-codes that indicate a temporary problem (by default 408,
+    429, 502, 503 and 504). Between two attempts the policy waits with exponential backoff, a ``Retry-After``-header
+    sent by the server is honoured.
+
+    ``GET``, ``PUT`` and ``DELETE`` are idempotent and retried on all of these errors. ``POST`` and ``SECURE_POST``
+    are only retried if the server certainly didn't process the request (status-codes 429 and 503, or if the
+    connection couldn't be established because it was refused, the host couldn't be resolved or connecting timed out),
+    a retried ``SECURE_POST`` gets a fresh security-key.
+
+    :param max_attempts: the maximum number of attempts (including the first one), ``1`` disables retrying
+    :param backoff_factor: the delay before the first retry in seconds, doubled for every further retry
+    :param max_backoff: the maximum delay between two attempts in seconds
+    :param jitter: if true, the delay is randomized between zero and the computed backoff
+    :param retry_on_status: the status-codes that are retried
+    :param respect_retry_after: if true, the delay is at least as long as the ``Retry-After``-header demands
+    :param max_retry_after: the maximum delay in seconds accepted from a ``Retry-After``-header
+    :param retry_non_idempotent: if true, ``POST`` and ``SECURE_POST`` are retried like idempotent requests
+    """
+
+    idempotent_methods = frozenset(("GET", "PUT", "DELETE"))
+    unprocessed_status = frozenset((429, 503))
+
+    def __init__(
+        self,
+        max_attempts: int = 3,
+        backoff_factor: float = 0.5,
+        max_backoff: float = 30.0,
+        jitter: bool = True,
+        retry_on_status: tuple[int, ...] = (408, 429, 502, 503, 504),
+        respect_retry_after: bool = True,
+        max_retry_after: float = 300.0,
+        retry_non_idempotent: bool = False,
+    ):
+        self.max_attempts = max_attempts
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self.jitter = jitter
+        self.retry_on_status = frozenset(retry_on_status)
+        self.respect_retry_after = respect_retry_after
+        self.max_retry_after = max_retry_after
+        self.retry_non_idempotent = retry_non_idempotent
+
+    def __repr__(self):
+        return f"""<{self.__class__.__name__} max_attempts={self.max_attempts}, """ \
+               f"""backoff_factor={self.backoff_factor}>"""
+
+    def is_idempotent(self, method: str) -> bool:
+        """
+        returns ``True`` if a request with this method may be sent more than once
+
+        :param method: the HTTP-method (or ``"SECURE_POST"``)
+        """
+        return self.retry_non_idempotent or method.upper() in self.idempotent_methods
+
+    def should_retry(self, method: str, attempt: int, status: int = None, exception: Exception = None) -> bool:
+        """
+        decides if a request is repeated
+
+        :param method: the HTTP-method (or ``"SECURE_POST"``)
+        :param attempt: the number of the attempt that failed (starting at 1)
+        :param status: the status-code of the response, if there is one
+        :param exception: the exception raised while sending the request, if there is one
+        :return: ``True`` if the request should be sent again
+        """
+        if attempt >= self.max_attempts:
+            return False
+        idempotent = self.is_idempotent(method)
+        if exception is not None:
+            if idempotent:
+                return isinstance(exception, _get_error_types()[0])
+            return _is_connection_setup_error(exception)
+        if status not in self.retry_on_status:
+            return False
+        return idempotent or status in self.unprocessed_status
+
+    def get_delay(self, attempt: int, response=None) -> float:
+        """
+        returns the number of seconds to wait before the next attempt
+
+        :param attempt: the number of the attempt that failed (starting at 1)
+        :param response: the ``WebResponse`` of the failed attempt, if there is one
+        :return: the delay in seconds
+        """
+        backoff = min(self.max_backoff, self.backoff_factor * 2 ** (attempt - 1))
+        if self.jitter:
+            backoff = random.uniform(0, backoff)
+        if self.respect_retry_after and response is not None:
+            retry_after = self._parse_retry_after(response.get_header("Retry-After"))
+            if retry_after is not None:
+                backoff = max(backoff, min(retry_after, self.max_retry_after))
+        return backoff
+
+    @staticmethod
+    def _parse_retry_after(value: str | None) -> float | None:
+        if not value:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+        try:
+            date = email.utils.parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        if date.tzinfo is None:
+            date = date.replace(tzinfo=datetime.timezone.utc)
+        return max(0.0, (date - datetime.datetime.now(datetime.timezone.utc)).total_seconds())
@@ -0,0 +1,179 @@
+import asyncio
+import os
+import threading
+import time
+from contextlib import contextmanager
+from . import _codec
+
+
+class Span:
+    """
+    A span of a ``Tracer``, further arguments can be added while it's open.
+    """
+
+    __slots__ = ("name", "category", "args")
+
+    def __init__(self, name: str, category: str, args: dict):
+        self.name = name
+        self.category = category
+        self.args = args
+
+    def set(self, **kwargs):
+        """
+        adds arguments that are shown with the span in the trace-viewer
+        """
+        self.args.update(kwargs)
+
+
+class _NoSpan:
+    __slots__ = ()
+
+    def set(self, **kwargs):
+        pass
+
+
+_no_span = _NoSpan()
+
+
+class Tracer:
+    """
+    Records spans (named periods of time) and exports them in the trace-event format of Chrome, so a run can be
+    opened in a trace-viewer like ``chrome://tracing`` or https://ui.perfetto.dev.
+
+    Every asyncio-task gets its own row in the viewer, so requests running at the same time are shown side by side.
+    """
+
+    def __init__(self):
+        self._events = []
+        self._tracks = {}
+        self._origin = time.perf_counter_ns()
+        self._pid = os.getpid()
+
+    def __len__(self):
+        return len(self._events)
+
+    def __repr__(self):
+        return f"""<{self.__class__.__name__} spans={len(self._events)}>"""
+
+    def _get_track(self) -> int:
+        try:
+            task = asyncio.current_task()
+        except RuntimeError:
+            task = None
+        owner = task if task is not None else threading.current_thread()
+        key = id(owner)
+        track = self._tracks.get(key)
+        if track is None:
+            track = self._tracks[key] = len(self._tracks) + 1
+            name = task.get_name() if task is not None else owner.name
+            self._events.append({"name": "thread_name", "ph": "M", "pid": self._pid, "tid": track,
+                                 "args": {"name": name}})
+        return track
+
+    def _now(self) -> float:
+        return (time.perf_counter_ns() - self._origin) / 1000
+
+    @contextmanager
+    def span(self, name: str, category: str = "scriptor", **args):
+        """
+        records the time spent in the ``with``-block
+
+        :param name: the name shown in the trace-viewer
+        :param category: the category, used to filter spans in the trace-viewer
+        :param args: additional arguments shown with the span
+        :return: a ``Span``, further arguments can be added with ``span.set(...)``
+        """
+        track = self._get_track()
+        span = Span(name, category, args)
+        start = self._now()
+        try:
+            yield span
+        except BaseException as e:
+            span.args["error"] = f"""{type(e).__name__}: {e}"""
+            raise
+        finally:
+            self._events.append({
+                "name": span.name,
+                "cat": span.category,
+                "ph": "X",
+                "ts": start,
+                "dur": self._now() - start,
+                "pid": self._pid,
+                "tid": track,
+                "args": span.args,
+            })
+
+    def instant(self, name: str, category: str = "scriptor", **args):
+        """
+        records a single point in time
+
+        :param name: the name shown in the trace-viewer
+        :param category: the category, used to filter events in the trace-viewer
+        :param args: additional arguments shown with the event
+        """
+        self._events.append({"name": name, "cat": category, "ph": "i", "s": "t", "ts": self._now(),
+                             "pid": self._pid, "tid": self._get_track(), "args": args})
+
+    def to_dict(self) -> dict:
+        """
+        returns the recorded spans in the trace-event format
+        """
+        return {"traceEvents": list(self._events), "displayTimeUnit": "ms"}
+
+    def export(self, filename: str = "trace.json"):
+        """
+        exports the recorded spans as JSON-file in the trace-event format
+
+        :param filename: the name of the file
+        :return: the ``File``
+        """
+        from .file import File
+        return File(_codec.dumps(self.to_dict()).encode("utf-8"), filename)
+
+
+_tracer = None
+
+
+def start_tracing() -> Tracer:
+    """
+    starts recording spans, a running recording is discarded
+
+    :return: the new ``Tracer``
+    """
+    global _tracer
+    _tracer = Tracer()
+    return _tracer
+
+
+def stop_tracing() -> Tracer | None:
+    """
+    stops recording spans
+
+    :return: the ``Tracer`` with the recorded spans, i.e. to call ``export`` on it
+    """
+    global _tracer
+    tracer, _tracer = _tracer, None
+    return tracer
+
+
+def get_tracer() -> Tracer | None:
+    """
+    returns the running ``Tracer`` or ``None`` if nothing is recorded
+    """
+    return _tracer
+
+
+@contextmanager
+def span(name: str, category: str = "scriptor", **args):
+    """
+    records the time spent in the ``with``-block if tracing has been started, otherwise does nothing
+
+    :param name: the name shown in the trace-viewer
+    :param category: the category, used to filter spans in the trace-viewer
+    :param args: additional arguments shown with the span
+    """
+    if _tracer is None:
+        yield _no_span
+        return
+    with _tracer.span(name, category, **args) as active_span:
+        yield active_span